@@ -5,11 +5,21 @@ A2A 어댑터 및 인터페이스 구현
 """
 
 import asyncio
-import json
+import heapq
+import socket
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextvars import ContextVar
+import msgpack
+import orjson
+import zstandard as zstd
 import websockets
 import httpx
-from typing import Dict, Any, List, Optional, Callable, Awaitable
-from datetime import datetime, timedelta
+from dataclasses import fields
+from enum import Enum
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Union, Collection
 import logging
 from abc import ABC, abstractmethod
 
@@ -18,11 +28,39 @@ from a2a_protocol import (
     StockAnalysisRequest, StockAnalysisResponse,
     PortfolioAnalysisRequest, PortfolioAnalysisResponse,
     RiskEventRequest, RiskEventResponse,
-    AgentCapability, A2AProtocol
+    AgentCapability, A2AProtocol, BROADCAST_ID
 )
 
 logger = logging.getLogger(__name__)
 
+_RESPONSE_TYPE_VALUE = MessageType.RESPONSE.value
+
+def _shallow_asdict(obj) -> Dict[str, Any]:
+    """dataclass를 재귀/deepcopy 없이 1단계 딕셔너리로 변환 (Enum 필드는 값으로)"""
+    result = {}
+    for f in fields(obj):
+        value = getattr(obj, f.name)
+        result[f.name] = value.value if isinstance(value, Enum) else value
+    return result
+
+def _set_tcp_nodelay(websocket):
+    """WebSocket 하부 TCP 소켓에 TCP_NODELAY 설정 (작은 프레임의 Nagle 지연 방지)"""
+    transport = getattr(websocket, "transport", None)
+    sock = transport.get_extra_info("socket") if transport else None
+    if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            logger.warning(f"Failed to set TCP_NODELAY: {e}")
+
+def _split_frame(frame):
+    """'sender_id:json' 프레임을 (sender_id, json) 으로 분리 (str/bytes 프레임 모두 지원)
+    
+    split()의 리스트 생성 없이 index + 슬라이스로 분리. bytes 프레임은 디코딩 없이 그대로 처리.
+    """
+    idx = frame.index(b":" if isinstance(frame, bytes) else ":")
+    return frame[:idx], frame[idx + 1:]
+
 class A2ATransport(ABC):
     """A2A 통신 전송 계층 인터페이스"""
     
@@ -45,22 +83,218 @@ class A2ATransport(ABC):
     async def connect(self, endpoint: str) -> bool:
         """연결"""
         pass
+    
+    async def broadcast(self, message: A2AMessage) -> int:
+        """연결된 모든 피어에 전송 (기본 구현은 단일 전송)"""
+        return 1 if await self.send_message(message) else 0
+    
+    async def stop(self):
+        """전송 계층 종료 (기본 구현은 할 일 없음)"""
+        pass
 
 class WebSocketTransport(A2ATransport):
-    """WebSocket 기반 A2A 통신"""
-    
-    def __init__(self, agent_id: str):
+    """WebSocket 기반 A2A 통신
+    
+    wire_format:
+        - "json": 'sender_id:json' 텍스트 프레이밍 (기존 피어 호환)
+        - "msgpack": MessagePack 바이너리 프레임 (양쪽 피어가 모두 msgpack으로 설정되어야 함)
+    
+    msgpack 모드에서는 송신 큐에 쌓인 메시지를 하나의 배열 프레임으로 묶어 전송하고,
+    각 프레임 앞에 1바이트 플래그를 붙여 COMPRESS_MIN_BYTES 초과 시 zstd로 압축한다.
+    """
+    
+    WIRE_FORMATS = ("json", "msgpack")
+    BATCH_MAX_MESSAGES = 64
+    BATCH_MAX_BYTES = 64 * 1024
+    DECODE_OFFLOAD_BYTES = 16 * 1024
+    COMPRESS_MIN_BYTES = 1024
+    FLAG_RAW = b"\x00"
+    FLAG_ZSTD = b"\x01"
+    UNPACKER_MAX_BUFFER = 16 << 20
+    STOP_FLUSH_TIMEOUT = 5.0  # 종료 시 송신 큐를 비우기 위해 기다리는 최대 시간(초)
+    
+    def __init__(self, agent_id: str, wire_format: str = "json"):
+        if wire_format not in self.WIRE_FORMATS:
+            raise ValueError(f"Unsupported wire format: {wire_format}")
         self.agent_id = agent_id
+        self.wire_format = wire_format
         self.websocket = None
         self.server = None
         self.message_handler = None
+        self._send_queue: Optional[asyncio.Queue] = None
+        self._sender_task: Optional[asyncio.Task] = None
+        self._inbox: List[Dict[str, Any]] = []
+        self._unpacker: Optional[msgpack.Unpacker] = None  # connect()로 맺은 연결의 수신용
+        self._peer_sockets = set()  # 브로드캐스트 대상 (서버로 접속한 클라이언트 + connect() 연결)
+        # 메시지 딕셔너리를 받아 처리했으면 True (A2AMessage 생성 생략용 fast path, 어댑터가 설정)
+        self.response_resolver: Optional[Callable[[Dict[str, Any]], bool]] = None
+        self._zc = zstd.ZstdCompressor(level=1)
+        # 큰 프레임은 스레드 풀에서 디코딩되므로 압축 해제기는 스레드별로 보관
+        self._zd_local = threading.local()
+    
+    @property
+    def _compression(self) -> Optional[str]:
+        """바이너리 프레임은 이중 압축을 피하기 위해 permessage-deflate 비활성화"""
+        return None if self.wire_format == "msgpack" else "deflate"
+    
+    def _encode(self, message: A2AMessage) -> Union[str, bytes]:
+        """메시지를 전송 프레임으로 인코딩 (메시지 객체에 캐시되어 재전송 시 재사용)"""
+        return message.cached_encoding(self.wire_format, self._encode_frame)
+    
+    def _encode_frame(self, message: A2AMessage) -> Union[str, bytes]:
+        """실제 프레임 인코딩 (json은 텍스트 프레임, msgpack은 바이너리 프레임)"""
+        if self.wire_format == "msgpack":
+            # sender_id는 message_dict 안에 이미 포함되어 있으므로 프리픽스 불필요
+            return msgpack.packb(message.to_dict(), use_bin_type=True)
+        # 기존 피어는 텍스트 프레임에 str.split(":", 1)을 적용하므로 str로 전송
+        return f"{message.sender_id}:{orjson.dumps(message.to_dict()).decode()}"
+    
+    def _compress_frame(self, frame: bytes) -> bytes:
+        """플래그 바이트 + (필요 시 zstd 압축된) 프레임"""
+        if len(frame) > self.COMPRESS_MIN_BYTES:
+            return self.FLAG_ZSTD + self._zc.compress(frame)
+        return self.FLAG_RAW + frame
+    
+    def _decompress_frame(self, frame: bytes) -> bytes:
+        """플래그 바이트를 확인하고 압축 해제"""
+        if frame[:1] == self.FLAG_ZSTD:
+            zd = getattr(self._zd_local, "zd", None)
+            if zd is None:
+                zd = self._zd_local.zd = zstd.ZstdDecompressor()
+            return zd.decompress(frame[1:])
+        return frame[1:]
+    
+    def _new_unpacker(self) -> Optional[msgpack.Unpacker]:
+        """연결별 스트리밍 언패커 (내부 버퍼를 프레임 간 재사용)"""
+        if self.wire_format != "msgpack":
+            return None
+        return msgpack.Unpacker(raw=False, max_buffer_size=self.UNPACKER_MAX_BUFFER)
+    
+    def _decode(self, frame, unpacker: Optional[msgpack.Unpacker] = None) -> List[Dict[str, Any]]:
+        """수신 프레임을 메시지 딕셔너리 목록으로 디코딩 (배치 프레임은 여러 개)"""
+        if self.wire_format == "msgpack":
+            payload = self._decompress_frame(frame)
+            if unpacker is None:
+                objects = [msgpack.unpackb(payload, raw=False)]
+            else:
+                unpacker.feed(payload)
+                objects = list(unpacker)
+                # 웹소켓 메시지 하나가 완결된 프레임이므로 버퍼에 남는 바이트가 있으면 손상된 프레임
+                # (C 구현은 미완성 객체가 남아 있으면 read_bytes에서 ValueError,
+                #  순수 파이썬 구현은 빈 버퍼에서 OutOfData)
+                try:
+                    leftover = unpacker.read_bytes(1)
+                except msgpack.OutOfData:
+                    leftover = b""
+                if leftover:
+                    raise ValueError("Incomplete msgpack frame")
+            
+            messages = []
+            for obj in objects:
+                if isinstance(obj, list):
+                    messages.extend(obj)
+                else:
+                    messages.append(obj)
+            return messages
+        sender_id, message_data = _split_frame(frame)
+        return [orjson.loads(message_data)]
+    
+    async def _decode_async(self, frame, unpacker: Optional[msgpack.Unpacker] = None) -> List[Dict[str, Any]]:
+        """큰 프레임은 스레드 풀에서 디코딩하여 이벤트 루프 블로킹 방지"""
+        if len(frame) > self.DECODE_OFFLOAD_BYTES:
+            return await asyncio.get_running_loop().run_in_executor(None, self._decode, frame, unpacker)
+        return self._decode(frame, unpacker)
+    
+    def _ensure_sender(self):
+        """배치 송신 태스크 기동 (실행 중인 루프에서 지연 생성)"""
+        if self._sender_task is None or self._sender_task.done():
+            if self._send_queue is None:
+                self._send_queue = asyncio.Queue()
+            self._sender_task = asyncio.create_task(self._sender_loop())
+    
+    async def _sender_loop(self):
+        """큐에 쌓인 메시지를 최대 BATCH_MAX_MESSAGES개 / BATCH_MAX_BYTES 까지 묶어 전송
+        
+        큐 항목은 (패킹된 메시지, 전송 결과 future) 이며, 프레임 전송 후 future에 성공 여부를 설정한다.
+        """
+        queue = self._send_queue
+        while True:
+            batch = [await queue.get()]
+            size = len(batch[0][0])
+            while (len(batch) < self.BATCH_MAX_MESSAGES and size < self.BATCH_MAX_BYTES
+                   and not queue.empty()):
+                item = queue.get_nowait()
+                batch.append(item)
+                size += len(item[0])
+            
+            delivered = False
+            try:
+                # 단건은 그대로, 다건은 배열 헤더 + 이미 패킹된 요소를 이어붙여 재인코딩 없이 전송
+                if len(batch) == 1:
+                    frame = batch[0][0]
+                else:
+                    frame = msgpack.Packer().pack_array_header(len(batch)) + b"".join(
+                        packed for packed, _ in batch
+                    )
+                frame = self._compress_frame(frame)
+                
+                if self.websocket and not self.websocket.closed:
+                    await self.websocket.send(frame)
+                    delivered = True
+                else:
+                    logger.error(f"WebSocket connection lost, dropped {len(batch)} message(s)")
+            except Exception as e:
+                logger.error(f"Failed to send batch of {len(batch)} message(s): {e}")
+            finally:
+                # 취소된 경우에도 대기 중인 송신자를 깨움
+                for _, done in batch:
+                    if not done.done():
+                        done.set_result(delivered)
+                    queue.task_done()
+    
+    async def stop(self):
+        """송신 큐를 비운 뒤 배치 송신 태스크, 서버, 연결 종료"""
+        task = self._sender_task
+        if task is not None and not task.done():
+            try:
+                await asyncio.wait_for(self._send_queue.join(), self.STOP_FLUSH_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"Send queue not drained within {self.STOP_FLUSH_TIMEOUT}s")
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._sender_task = None
+        
+        # 전송되지 못하고 남은 메시지는 실패로 완료
+        queue = self._send_queue
+        while queue is not None and not queue.empty():
+            _, done = queue.get_nowait()
+            if not done.done():
+                done.set_result(False)
+            queue.task_done()
+        
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.websocket is not None and not self.websocket.closed:
+            await self.websocket.close()
     
     async def send_message(self, message: A2AMessage) -> bool:
         """WebSocket을 통한 메시지 전송"""
         try:
             if self.websocket and not self.websocket.closed:
-                message_str = message.sender_id + ":" + json.dumps(message.to_dict())
-                await self.websocket.send(message_str)
+                if self.wire_format == "msgpack":
+                    # 배치 송신 태스크가 실제로 프레임을 쓴 뒤에 결과를 반환
+                    self._ensure_sender()
+                    done = asyncio.get_running_loop().create_future()
+                    await self._send_queue.put((self._encode(message), done))
+                    if not await done:
+                        return False
+                else:
+                    await self.websocket.send(self._encode(message))
                 logger.info(f"Message sent to {message.receiver_id}: {message.message_type.value}")
                 return True
             else:
@@ -70,15 +304,31 @@ class WebSocketTransport(A2ATransport):
             logger.error(f"Failed to send message: {e}")
             return False
     
+    async def broadcast(self, message: A2AMessage) -> int:
+        """프레임을 한 번만 인코딩하여 모든 피어 소켓에 전송, 성공한 피어 수 반환"""
+        frame = self._encode(message)
+        if self.wire_format == "msgpack":
+            frame = self._compress_frame(frame)
+        
+        peers = [ws for ws in self._peer_sockets if not ws.closed]
+        results = await asyncio.gather(*(ws.send(frame) for ws in peers), return_exceptions=True)
+        sent = sum(1 for result in results if not isinstance(result, Exception))
+        logger.info(f"Broadcast {message.message_type.value} to {sent}/{len(peers)} peers")
+        return sent
+    
     async def receive_message(self) -> Optional[A2AMessage]:
         """WebSocket을 통한 메시지 수신"""
         try:
-            if self.websocket and not self.websocket.closed:
+            if not self._inbox and self.websocket and not self.websocket.closed:
                 message_str = await self.websocket.recv()
-                sender_id, message_data = message_str.split(":", 1)
-                message_dict = json.loads(message_data)
-                message = A2AMessage.from_dict(message_dict)
-                return message
+                try:
+                    self._inbox.extend(await self._decode_async(message_str, self._unpacker))
+                except Exception:
+                    # 남은 바이트가 이후 프레임을 오염시키지 않도록 언패커 교체
+                    self._unpacker = self._new_unpacker()
+                    raise
+            if self._inbox:
+                return A2AMessage.from_dict(self._inbox.pop(0))
         except Exception as e:
             logger.error(f"Failed to receive message: {e}")
         return None
@@ -87,38 +337,61 @@ class WebSocketTransport(A2ATransport):
         """WebSocket 서버 시작"""
         self.message_handler = message_handler
         
+        # 모든 연결이 하나의 이벤트 루프를 공유하므로 handle_client 및 message_handler 안에서
+        # 블로킹 호출 금지 (큰 프레임 디코딩은 _decode_async가 스레드 풀로 넘김)
         async def handle_client(websocket, path):
             self.websocket = websocket
+            self._peer_sockets.add(websocket)
+            _set_tcp_nodelay(websocket)
+            unpacker = self._new_unpacker()
             logger.info(f"A2A client connected: {websocket.remote_address}")
             
             try:
                 async for message_str in websocket:
                     try:
-                        sender_id, message_data = message_str.split(":", 1)
-                        message_dict = json.loads(message_data)
-                        message = A2AMessage.from_dict(message_dict)
-                        
-                        if message.receiver_id == self.agent_id:
-                            await message_handler(message)
-                        else:
-                            logger.warning(f"Message not for this agent: {message.receiver_id}")
-                            
+                        message_dicts = await self._decode_async(message_str, unpacker)
                     except Exception as e:
-                        logger.error(f"Error processing message: {e}")
+                        logger.error(f"Error decoding frame: {e}")
+                        # 남은 바이트가 이후 프레임을 오염시키지 않도록 언패커 교체
+                        unpacker = self._new_unpacker()
+                        continue
+                    
+                    # 배치 프레임은 요소별로 디스패치
+                    for message_dict in message_dicts:
+                        try:
+                            if self.response_resolver and self.response_resolver(message_dict):
+                                continue
+                            
+                            message = A2AMessage.from_dict(message_dict)
+                            
+                            if message.receiver_id == self.agent_id or message.receiver_id == BROADCAST_ID:
+                                await message_handler(message)
+                            else:
+                                logger.warning(f"Message not for this agent: {message.receiver_id}")
+                                
+                        except Exception as e:
+                            logger.error(f"Error processing message: {e}")
                         
             except websockets.exceptions.ConnectionClosed:
                 logger.info("A2A client disconnected")
             except Exception as e:
                 logger.error(f"WebSocket error: {e}")
+            finally:
+                self._peer_sockets.discard(websocket)
         
         # 컨테이너 외부 접근을 위해 0.0.0.0 바인딩
-        self.server = await websockets.serve(handle_client, "0.0.0.0", port)
+        self.server = await websockets.serve(
+            handle_client, "0.0.0.0", port, compression=self._compression
+        )
         logger.info(f"A2A WebSocket server started on port {port}")
     
     async def connect(self, endpoint: str) -> bool:
         """WebSocket 서버에 연결"""
         try:
-            self.websocket = await websockets.connect(endpoint)
+            self.websocket = await websockets.connect(endpoint, compression=self._compression)
+            self._unpacker = self._new_unpacker()
+            self._peer_sockets.add(self.websocket)
+            _set_tcp_nodelay(self.websocket)
             logger.info(f"Connected to A2A server: {endpoint}")
             return True
         except Exception as e:
@@ -126,21 +399,39 @@ class WebSocketTransport(A2ATransport):
             return False
 
 class HTTPTransport(A2ATransport):
-    """HTTP 기반 A2A 통신"""
+    """HTTP 기반 A2A 통신 (HTTP/2 + keep-alive 커넥션 풀 재사용)"""
+    
+    # 수신 폴링은 서버가 메시지를 보류하는 롱폴링을 고려해 read 타임아웃을 길게 설정
+    POLL_TIMEOUT = httpx.Timeout(120.0, read=120.0)
     
     def __init__(self, agent_id: str, base_url: str = "http://localhost:8000"):
         self.agent_id = agent_id
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=50,
+                keepalive_expiry=60.0
+            ),
+            headers={"connection": "keep-alive"}
+        )
     
     async def send_message(self, message: A2AMessage) -> bool:
         """HTTP를 통한 메시지 전송"""
         try:
-            response = await self.client.post(
+            # httpx 내부 json 인코더 대신 orjson으로 미리 직렬화
+            # 응답 본문은 사용하지 않으므로 스트림 모드로 상태 코드만 확인 (디버그 시에만 읽음)
+            async with self.client.stream(
+                "POST",
                 f"{self.base_url}/a2a/message",
-                json=message.to_dict()
-            )
-            response.raise_for_status()
+                content=orjson.dumps(message.to_dict()),
+                headers={"content-type": "application/json"}
+            ) as response:
+                response.raise_for_status()
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"HTTP response body: {(await response.aread())[:512]!r}")
             logger.info(f"HTTP message sent to {message.receiver_id}")
             return True
         except Exception as e:
@@ -151,10 +442,11 @@ class HTTPTransport(A2ATransport):
         """HTTP를 통한 메시지 수신 (폴링 방식)"""
         try:
             response = await self.client.get(
-                f"{self.base_url}/a2a/messages/{self.agent_id}"
+                f"{self.base_url}/a2a/messages/{self.agent_id}",
+                timeout=self.POLL_TIMEOUT
             )
             response.raise_for_status()
-            messages = response.json()
+            messages = orjson.loads(response.content)
             
             if messages:
                 # 가장 오래된 메시지부터 처리
@@ -165,6 +457,10 @@ class HTTPTransport(A2ATransport):
             logger.error(f"Failed to receive HTTP message: {e}")
         return None
     
+    async def stop(self):
+        """커넥션 풀 종료"""
+        await self.client.aclose()
+    
     async def start_server(self, port: int, message_handler: Callable[[A2AMessage], Awaitable[None]]):
         """HTTP 서버는 별도 구현 필요 (FastAPI 등)"""
         raise NotImplementedError("HTTP server requires separate implementation")
@@ -180,30 +476,70 @@ class HTTPTransport(A2ATransport):
             logger.error(f"Failed to connect to A2A HTTP server: {e}")
             return False
 
+# 전송 타입 -> (agent_id, wire_format) 를 받아 전송 계층을 만드는 팩토리
+_TRANSPORT_FACTORIES: Dict[str, Callable[[str, str], A2ATransport]] = {
+    "websocket": WebSocketTransport,
+    "http": lambda agent_id, wire_format: HTTPTransport(agent_id),
+}
+
+# 요청을 보낸 작업의 소유자 표시 (태스크 생성 시 컨텍스트가 복사되므로 하위 태스크의 요청에도 적용)
+# clear_pending_requests(keep_owners=...)가 특정 소유자의 요청을 남겨둘 때 사용
+request_owner: ContextVar[Optional[object]] = ContextVar("a2a_request_owner", default=None)
+
+class _Pending:
+    """응답 대기 중인 요청 (요청 수가 많을 때 dict 대비 메모리 절감)"""
+    __slots__ = ("request", "timestamp", "type", "future", "partial", "owner")
+    
+    def __init__(self, request: A2AMessage, timestamp: float, type: str, future: asyncio.Future):
+        self.request = request
+        self.timestamp = timestamp
+        self.type = type
+        self.future = future
+        self.partial: Optional[Dict[str, Any]] = None  # 청크 응답 수집 중인 payload
+        self.owner = request_owner.get()
+
+# 같은 프로세스에 생성된 어댑터 (agent_id -> 어댑터), 수신자가 여기 있으면 전송 계층 없이 직접 전달
+_LOCAL_ADAPTERS: "weakref.WeakValueDictionary[str, A2AAdapter]" = weakref.WeakValueDictionary()
+
 class A2AAdapter:
     """A2A 어댑터 메인 클래스"""
     
-    def __init__(self, agent_id: str, agent_role: AgentRole, transport_type: str = "websocket"):
+    REQUEST_TTL = 300.0  # 5분
+    EXPIRY_HEAP_SLACK = 64  # 만료 힙이 대기 요청 수의 2배 + 이 값을 넘으면 재구성
+    STREAM_CHUNK_SIZE = 32  # 청크 응답 한 프레임당 리스트 항목 수
+    # 등록 정보 중 보관할 필드 (나머지는 필요 시 능력 조회로 다시 받음)
+    REGISTRY_FIELDS = ("role", "capabilities", "max_concurrent_requests", "version")
+    
+    def __init__(self, agent_id: str, agent_role: AgentRole, transport_type: str = "websocket",
+                 wire_format: str = "json", max_agents: int = 1024):
         self.agent_id = agent_id
         self.agent_role = agent_role
         self.protocol = A2AProtocol(agent_id, agent_role)
+        self.wire_format = wire_format
         self.transport = self._create_transport(transport_type)
         self.capabilities = None
-        self.registered_agents = {}
-        self.pending_requests = {}
-        self.message_handlers = {}
+        self.max_agents = max_agents
+        self.registered_agents: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # LRU
+        self.pending_requests: Dict[str, _Pending] = {}
+        self._expiry_heap: List[tuple] = []  # (만료 monotonic 시각, message_id)
+        # MessageType.ordinal 로 인덱싱하는 핸들러 디스패치 테이블
+        self.message_handlers: List[Optional[Callable[[A2AMessage], Awaitable[None]]]] = [None] * len(MessageType)
         
         # 기본 메시지 핸들러 등록
         self._register_default_handlers()
+        
+        if isinstance(self.transport, WebSocketTransport):
+            self.transport.response_resolver = self._resolve_response_dict
+        
+        self._direct_tasks = set()  # 직접 전달 중인 핸들러 태스크 (GC 방지용 참조)
+        _LOCAL_ADAPTERS[agent_id] = self
     
     def _create_transport(self, transport_type: str) -> A2ATransport:
         """전송 계층 생성"""
-        if transport_type == "websocket":
-            return WebSocketTransport(self.agent_id)
-        elif transport_type == "http":
-            return HTTPTransport(self.agent_id)
-        else:
+        factory = _TRANSPORT_FACTORIES.get(transport_type)
+        if factory is None:
             raise ValueError(f"Unsupported transport type: {transport_type}")
+        return factory(self.agent_id, self.wire_format)
     
     def _register_default_handlers(self):
         """기본 메시지 핸들러 등록"""
@@ -217,12 +553,13 @@ class A2AAdapter:
     def register_capabilities(self, capabilities: AgentCapability):
         """에이전트 능력 등록"""
         self.capabilities = capabilities
+        # 능력 조회 응답용 딕셔너리는 프로토콜이 등록 시 한 번만 생성
         self.protocol.register_capabilities(capabilities)
         logger.info(f"Agent {self.agent_id} capabilities registered: {capabilities.role.value}")
     
     def register_handler(self, message_type: MessageType, handler: Callable[[A2AMessage], Awaitable[None]]):
         """메시지 핸들러 등록"""
-        self.message_handlers[message_type] = handler
+        self.message_handlers[message_type.ordinal] = handler
         logger.info(f"Handler registered for {message_type.value}")
     
     async def start_server(self, port: int):
@@ -230,6 +567,11 @@ class A2AAdapter:
         await self.transport.start_server(port, self._handle_message)
         logger.info(f"A2A adapter server started on port {port}")
     
+    async def stop(self):
+        """전송 계층 종료 (큐에 쌓인 메시지 전송 후 송신 태스크 정리)"""
+        await self.transport.stop()
+        logger.info(f"A2A adapter {self.agent_id} stopped")
+    
     async def connect_to_registry(self, registry_endpoint: str):
         """레지스트리에 연결 및 등록"""
         if not self.capabilities:
@@ -245,7 +587,7 @@ class A2AAdapter:
     async def discover_agents(self, target_role: Optional[AgentRole] = None) -> List[Dict[str, Any]]:
         """다른 에이전트 탐색"""
         query_msg = self.protocol.get_capability_query_message(target_role)
-        await self.transport.send_message(query_msg)
+        await self.send_message(query_msg)
         
         # 응답 대기 (실제 구현에서는 더 정교한 대기 메커니즘 필요)
         await asyncio.sleep(1)
@@ -260,17 +602,13 @@ class A2AAdapter:
         )
         
         # 요청 저장 (응답 매칭용)
-        self.pending_requests[request_msg.message_id] = {
-            "request": request_msg,
-            "timestamp": datetime.now(),
-            "type": "stock_analysis"
-        }
+        self._track_request(request_msg, "stock_analysis")
         
-        # 메시지 전송
-        if await self.transport.send_message(request_msg):
-            # 응답 대기 (실제 구현에서는 콜백 기반으로 처리)
+        # 메시지 전송 후 응답 대기
+        if await self.send_message(request_msg):
             return await self._wait_for_response(request_msg.message_id, timeout=30)
         
+        self.pending_requests.pop(request_msg.message_id, None)
         return None
     
     async def request_portfolio_analysis(self, target_agent_id: str, user_id: str,
@@ -282,16 +620,13 @@ class A2AAdapter:
         )
         
         # 요청 저장
-        self.pending_requests[request_msg.message_id] = {
-            "request": request_msg,
-            "timestamp": datetime.now(),
-            "type": "portfolio_analysis"
-        }
+        self._track_request(request_msg, "portfolio_analysis")
         
         # 메시지 전송
-        if await self.transport.send_message(request_msg):
+        if await self.send_message(request_msg):
             return await self._wait_for_response(request_msg.message_id, timeout=30)
         
+        self.pending_requests.pop(request_msg.message_id, None)
         return None
     
     async def request_risk_analysis(self, target_agent_id: str, ticker: str,
@@ -303,24 +638,60 @@ class A2AAdapter:
         )
         
         # 요청 저장
-        self.pending_requests[request_msg.message_id] = {
-            "request": request_msg,
-            "timestamp": datetime.now(),
-            "type": "risk_analysis"
-        }
+        self._track_request(request_msg, "risk_analysis")
         
         # 메시지 전송
-        if await self.transport.send_message(request_msg):
+        if await self.send_message(request_msg):
             return await self._wait_for_response(request_msg.message_id, timeout=30)
         
+        self.pending_requests.pop(request_msg.message_id, None)
         return None
     
+    async def send_message(self, message: A2AMessage, direct: bool = True) -> bool:
+        """메시지 전송. direct=True 이고 수신자가 같은 프로세스의 어댑터면 전송 계층(인코딩/소켓)을 건너뛰고 바로 전달"""
+        if direct:
+            target = _LOCAL_ADAPTERS.get(message.receiver_id)
+            if target is not None:
+                # 원격 전송과 같이 송신자는 처리 완료를 기다리지 않음
+                task = asyncio.get_running_loop().create_task(target._handle_message(message))
+                self._direct_tasks.add(task)
+                task.add_done_callback(self._direct_tasks.discard)
+                return True
+        return await self.transport.send_message(message)
+    
+    def _track_request(self, request_msg: A2AMessage, request_type: str):
+        """응답 매칭을 위해 요청 저장 (응답/에러 핸들러가 future를 완료시킴)
+        
+        추적되는 요청의 응답은 _deliver_response가 청크를 다시 합치므로 청크 응답 수신 가능함을 알린다.
+        """
+        request_msg.payload["accept_stream"] = True
+        now = time.monotonic()
+        self.pending_requests[request_msg.message_id] = _Pending(
+            request_msg, now, request_type, asyncio.get_running_loop().create_future()
+        )
+        self._prune_expiry_heap(now)
+        heapq.heappush(self._expiry_heap, (now + self.REQUEST_TTL, request_msg.message_id))
+    
+    def _prune_expiry_heap(self, now: float):
+        """만료됐거나 이미 완료된 요청의 힙 항목 정리 (힙 크기를 대기 요청 수에 비례하게 유지)"""
+        heap = self._expiry_heap
+        pending = self.pending_requests
+        while heap and (heap[0][0] < now or heap[0][1] not in pending):
+            _, request_id = heapq.heappop(heap)
+            if pending.pop(request_id, None) is not None:
+                logger.info(f"Cleaned up expired request: {request_id}")
+        
+        # 힙 중간에 완료된 요청 항목이 쌓이면 대기 중인 항목만 남겨 재구성
+        if len(heap) > 2 * len(pending) + self.EXPIRY_HEAP_SLACK:
+            heap[:] = [entry for entry in heap if entry[1] in pending]
+            heapq.heapify(heap)
+    
     async def _handle_message(self, message: A2AMessage):
         """들어오는 메시지 처리"""
         logger.info(f"Received message: {message.message_type.value} from {message.sender_id}")
         
         # 메시지 타입별 핸들러 호출
-        handler = self.message_handlers.get(message.message_type)
+        handler = self.message_handlers[message.message_type.ordinal]
         if handler:
             try:
                 await handler(message)
@@ -330,7 +701,7 @@ class A2AAdapter:
                 error_response = self.protocol.create_error_response(
                     message, str(e), "HANDLER_ERROR"
                 )
-                await self.transport.send_message(error_response)
+                await self.send_message(error_response)
         else:
             logger.warning(f"No handler for message type: {message.message_type.value}")
     
@@ -342,90 +713,163 @@ class A2AAdapter:
     async def _handle_response(self, message: A2AMessage):
         """응답 메시지 처리"""
         correlation_id = message.correlation_id
-        if correlation_id and correlation_id in self.pending_requests:
-            # 대기 중인 요청에 응답 저장
-            self.pending_requests[correlation_id]["response"] = message.payload
+        pending = self.pending_requests.get(correlation_id) if correlation_id else None
+        if pending and not pending.future.done():
+            # 대기 중인 요청을 즉시 깨움
+            if self._deliver_response(pending, message.payload):
+                logger.info(f"Response received for request {correlation_id}")
+    
+    def _deliver_response(self, pending: _Pending, payload: Dict[str, Any]) -> bool:
+        """응답 payload를 future에 전달 (청크 응답은 final 청크까지 모은 뒤 완료), 완료 시 True"""
+        stream = payload.get("_stream")
+        if stream is None:
+            pending.future.set_result(payload)
+            return True
+        
+        key = stream["key"]
+        if pending.partial is None:
+            # 첫 청크(seq 0)는 리스트를 뺀 요약 응답
+            pending.partial = {k: v for k, v in payload.items() if k != "_stream"}
+            pending.partial.setdefault(key, [])
+        else:
+            pending.partial[key].extend(payload.get(key, ()))
+        
+        if stream["final"]:
+            pending.future.set_result(pending.partial)
+            return True
+        return False
+    
+    async def _send_response(self, original_message: A2AMessage, response_data: Dict[str, Any],
+                             stream_key: Optional[str] = None):
+        """응답 전송. 요청이 accept_stream을 알린 경우에만, stream_key 리스트가 크면
+        요약 응답 + STREAM_CHUNK_SIZE 단위 청크로 나눠 전송 (그 외에는 전체 응답 한 번에 전송)"""
+        items = response_data.get(stream_key) if stream_key else None
+        if (not items or len(items) <= self.STREAM_CHUNK_SIZE
+                or not original_message.payload.get("accept_stream")):
+            await self.send_message(self.protocol.create_response(original_message, response_data))
+            return
+        
+        summary = {k: v for k, v in response_data.items() if k != stream_key}
+        summary["_stream"] = {"key": stream_key, "seq": 0, "final": False}
+        await self.send_message(self.protocol.create_response(original_message, summary))
+        
+        size = self.STREAM_CHUNK_SIZE
+        last_start = len(items) - 1 - (len(items) - 1) % size
+        for seq, start in enumerate(range(0, len(items), size), 1):
+            chunk = {
+                stream_key: items[start:start + size],
+                "_stream": {"key": stream_key, "seq": seq, "final": start == last_start}
+            }
+            await self.send_message(self.protocol.create_response(original_message, chunk))
+    
+    def _resolve_response_dict(self, message_dict: Dict[str, Any]) -> bool:
+        """대기 중인 요청에 대한 응답이면 A2AMessage 생성 없이 future를 바로 완료"""
+        if (message_dict.get("message_type") != _RESPONSE_TYPE_VALUE
+                or message_dict.get("receiver_id") != self.agent_id):
+            return False
+        
+        correlation_id = message_dict.get("correlation_id")
+        pending = self.pending_requests.get(correlation_id)
+        if pending is None or pending.future.done():
+            return False
+        
+        if self._deliver_response(pending, message_dict["payload"]):
             logger.info(f"Response received for request {correlation_id}")
+        return True
     
     async def _handle_error(self, message: A2AMessage):
         """에러 메시지 처리"""
         correlation_id = message.correlation_id
-        if correlation_id and correlation_id in self.pending_requests:
-            # 대기 중인 요청에 에러 저장
-            self.pending_requests[correlation_id]["error"] = message.payload
+        pending = self.pending_requests.get(correlation_id) if correlation_id else None
+        if pending and not pending.future.done():
+            # 대기 중인 요청에 에러 전달
+            pending.future.set_exception(RuntimeError(message.payload))
             logger.error(f"Error received for request {correlation_id}: {message.payload}")
     
     async def _handle_heartbeat(self, message: A2AMessage):
         """하트비트 메시지 처리"""
-        logger.debug(f"Heartbeat from {message.sender_id}")
+        ts_ns = message.payload.get("ts_ns")
+        if ts_ns is not None:
+            logger.debug(f"Heartbeat from {message.sender_id} ({(time.time_ns() - ts_ns) / 1e6:.1f}ms)")
+        else:
+            logger.debug(f"Heartbeat from {message.sender_id}")
         # 하트비트 응답 (선택사항)
     
     async def _handle_registration(self, message: A2AMessage):
         """에이전트 등록 처리"""
         if message.sender_id != self.agent_id:  # 자신의 등록 메시지는 무시
             capability_data = message.payload
-            self.registered_agents[message.sender_id] = capability_data
+            self.registered_agents[message.sender_id] = {
+                key: capability_data[key] for key in self.REGISTRY_FIELDS if key in capability_data
+            }
+            self.registered_agents.move_to_end(message.sender_id)
+            if len(self.registered_agents) > self.max_agents:
+                evicted_id, _ = self.registered_agents.popitem(last=False)
+                logger.info(f"Agent evicted from registry: {evicted_id}")
             logger.info(f"Agent registered: {message.sender_id} - {capability_data.get('role', 'unknown')}")
     
     async def _handle_capability_query(self, message: A2AMessage):
         """능력 조회 처리"""
         # 자신의 능력 정보 응답
-        if self.capabilities:
-            response = self.protocol.create_response(message, asdict(self.capabilities))
-            await self.transport.send_message(response)
+        if self.protocol.capabilities_payload:
+            response = self.protocol.create_response(message, self.protocol.capabilities_payload)
+            await self.send_message(response)
     
     async def _wait_for_response(self, request_id: str, timeout: int = 30) -> Optional[Dict[str, Any]]:
-        """응답 대기"""
-        start_time = datetime.now()
-        
-        while (datetime.now() - start_time).seconds < timeout:
-            if request_id in self.pending_requests:
-                pending = self.pending_requests[request_id]
-                
-                if "response" in pending:
-                    response_data = pending["response"]
-                    del self.pending_requests[request_id]
-                    return response_data
-                elif "error" in pending:
-                    error_data = pending["error"]
-                    del self.pending_requests[request_id]
-                    logger.error(f"Request {request_id} failed: {error_data}")
-                    return None
-            
-            await asyncio.sleep(0.1)
+        """응답 대기 (폴링 없이 future 완료 시 즉시 반환)"""
+        pending = self.pending_requests.get(request_id)
+        if not pending:
+            return None
         
-        # 타임아웃
-        if request_id in self.pending_requests:
-            del self.pending_requests[request_id]
-        logger.warning(f"Request {request_id} timed out")
+        try:
+            return await asyncio.wait_for(pending.future, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Request {request_id} timed out")
+        except RuntimeError as e:
+            logger.error(f"Request {request_id} failed: {e}")
+        finally:
+            self.pending_requests.pop(request_id, None)
         return None
     
     async def send_heartbeat(self, target_agent_id: str):
         """하트비트 전송"""
         heartbeat_msg = self.protocol.create_message(
-            target_agent_id, MessageType.HEARTBEAT, {"timestamp": datetime.now().isoformat()}
+            target_agent_id, MessageType.HEARTBEAT, {"ts_ns": time.time_ns()}
+        )
+        await self.send_message(heartbeat_msg)
+    
+    async def broadcast_heartbeat(self) -> int:
+        """모든 피어에 하트비트 전송 (receiver_id="*" 메시지 하나를 한 번만 인코딩)"""
+        heartbeat_msg = self.protocol.create_message(
+            BROADCAST_ID, MessageType.HEARTBEAT, {"ts_ns": time.time_ns()}
         )
-        await self.transport.send_message(heartbeat_msg)
+        return await self.transport.broadcast(heartbeat_msg)
     
     async def cleanup_expired_requests(self):
-        """만료된 요청 정리"""
-        current_time = datetime.now()
-        expired_requests = []
+        """만료된 요청 정리 (만료 힙에서 만료/완료된 항목만 꺼냄)"""
+        self._prune_expiry_heap(time.monotonic())
+
+    def clear_pending_requests(self, keep_owners: Collection[object] = ()):
+        """대기 중인 요청 정리 (대기자는 RuntimeError로 깨어나 None을 반환받음)
         
+        keep_owners에 속한 소유자(request_owner)가 보낸 요청은 그대로 두어 응답을 계속 기다린다.
+        """
+        kept = {}
         for request_id, pending in self.pending_requests.items():
-            if (current_time - pending["timestamp"]).seconds > 300:  # 5분
-                expired_requests.append(request_id)
-        
-        for request_id in expired_requests:
-            del self.pending_requests[request_id]
-            logger.info(f"Cleaned up expired request: {request_id}")
+            if pending.owner is not None and pending.owner in keep_owners:
+                kept[request_id] = pending
+            elif not pending.future.done():
+                pending.future.set_exception(RuntimeError(f"Request {request_id} cleared"))
+        self.pending_requests = kept
+        self._expiry_heap[:] = [entry for entry in self._expiry_heap if entry[1] in kept]
+        heapq.heapify(self._expiry_heap)
 
 # 특화된 어댑터들
 class InvestmentA2AAdapter(A2AAdapter):
     """투자 분석 에이전트용 A2A 어댑터"""
     
-    def __init__(self, transport_type: str = "websocket"):
-        super().__init__("investment_agent_001", AgentRole.INVESTMENT_ANALYST, transport_type)
+    def __init__(self, transport_type: str = "websocket", wire_format: str = "json"):
+        super().__init__("investment_agent_001", AgentRole.INVESTMENT_ANALYST, transport_type, wire_format)
         
         # 투자 분석 관련 핸들러 등록
         self.register_handler(MessageType.REQUEST, self._handle_investment_request)
@@ -448,17 +892,17 @@ class InvestmentA2AAdapter(A2AAdapter):
                 
                 # 응답 생성
                 response = self.protocol.create_response(message, analysis_result)
-                await self.transport.send_message(response)
+                await self.send_message(response)
                 
             except Exception as e:
                 error_response = self.protocol.create_error_response(message, str(e))
-                await self.transport.send_message(error_response)
+                await self.send_message(error_response)
 
 class RiskA2AAdapter(A2AAdapter):
     """리스크 분석 에이전트용 A2A 어댑터"""
     
-    def __init__(self, transport_type: str = "websocket"):
-        super().__init__("risk_agent_001", AgentRole.RISK_ASSESSOR, transport_type)
+    def __init__(self, transport_type: str = "websocket", wire_format: str = "json"):
+        super().__init__("risk_agent_001", AgentRole.RISK_ASSESSOR, transport_type, wire_format)
         
         # 리스크 분석 관련 핸들러 등록
         self.register_handler(MessageType.REQUEST, self._handle_risk_request)
@@ -485,22 +929,21 @@ class RiskA2AAdapter(A2AAdapter):
                     "high_risk_events": analysis.high_risk_events,
                     "risk_factors": analysis.risk_factors,
                     "recommendation": analysis.recommendation,
-                    "recent_events": [asdict(event) for event in analysis.recent_events]
+                    "recent_events": [_shallow_asdict(event) for event in analysis.recent_events]
                 }
                 
-                # 응답 생성
-                response = self.protocol.create_response(message, response_data)
-                await self.transport.send_message(response)
+                # 응답 전송 (이벤트가 많으면 청크로 나눠 전송)
+                await self._send_response(message, response_data, stream_key="recent_events")
                 
             except Exception as e:
                 error_response = self.protocol.create_error_response(message, str(e))
-                await self.transport.send_message(error_response)
+                await self.send_message(error_response)
 
 class PortfolioA2AAdapter(A2AAdapter):
     """포트폴리오 관리 에이전트용 A2A 어댑터"""
     
-    def __init__(self, transport_type: str = "websocket"):
-        super().__init__("portfolio_agent_001", AgentRole.PORTFOLIO_MANAGER, transport_type)
+    def __init__(self, transport_type: str = "websocket", wire_format: str = "json"):
+        super().__init__("portfolio_agent_001", AgentRole.PORTFOLIO_MANAGER, transport_type, wire_format)
         
         # 포트폴리오 관리 관련 핸들러 등록
         self.register_handler(MessageType.REQUEST, self._handle_portfolio_request)
@@ -531,10 +974,9 @@ class PortfolioA2AAdapter(A2AAdapter):
                     "sector_allocation": analysis.sector_allocation
                 }
                 
-                # 응답 생성
-                response = self.protocol.create_response(message, response_data)
-                await self.transport.send_message(response)
+                # 응답 전송 (추천 항목이 많으면 청크로 나눠 전송)
+                await self._send_response(message, response_data, stream_key="recommendations")
                 
             except Exception as e:
                 error_response = self.protocol.create_error_response(message, str(e))
-                await self.transport.send_message(error_response)
+                await self.send_message(error_response)
@@ -5,19 +5,23 @@ A2A 연동 통합 모듈
 """
 
 import asyncio
+import bisect
 import logging
-from typing import Dict, Any, List, Optional
+import numpy as np
+import orjson
+from typing import Dict, Any, List, Optional, Union
 import os
-from datetime import datetime
+import time
 
 from a2a_protocol import (
-    AgentCapability, AgentRole, A2AProtocol,
+    AgentCapability, AgentRole, A2AProtocol, AGENT_ROLE_VALUES, format_timestamp_ns,
+    encode_batch_frame, decode_batch_frame,
     StockAnalysisRequest, StockAnalysisResponse,
     PortfolioAnalysisRequest, PortfolioAnalysisResponse,
     RiskEventRequest, RiskEventResponse
 )
 from a2a_adapter import (
-    InvestmentA2AAdapter, RiskA2AAdapter, PortfolioA2AAdapter
+    InvestmentA2AAdapter, RiskA2AAdapter, PortfolioA2AAdapter, request_owner
 )
 
 # 기존 모듈들 import
@@ -29,13 +33,70 @@ from investment_profile import InvestmentProfile
 
 logger = logging.getLogger(__name__)
 
+_SUPPORTED_TICKERS = frozenset({"AAPL", "GOOGL", "MSFT", "AMZN", "TSLA", "META", "NVDA", "NFLX"})
+
+# 문자열 신뢰도 -> 숫자 (앞에서부터 먼저 포함된 레벨 적용)
+_CONFIDENCE_LEVELS = (("high", 0.8), ("medium", 0.6), ("low", 0.4))
+
+# 통합 점수 구간별 (action, confidence): 30 미만 / 50 미만 / 70 미만 / 70 이상
+_SCORE_THRESHOLDS = (30, 50, 70)
+_SCORE_ACTIONS = (("SELL", "HIGH"), ("HOLD", "MEDIUM"), ("BUY", "MEDIUM"), ("STRONG_BUY", "HIGH"))
+
+# 어댑터 이름 -> (어댑터 클래스, 서버 포트, AgentCapability 인자)
+_ADAPTER_SPECS = {
+    "investment": (InvestmentA2AAdapter, 8766, {
+        "role": AgentRole.INVESTMENT_ANALYST,
+        "capabilities": [
+            "stock_analysis", "technical_analysis", "fundamental_analysis",
+            "investment_recommendations", "portfolio_optimization",
+            "risk_assessment", "market_research"
+        ],
+        "supported_timeframes": frozenset({"1d", "1w", "1m", "3m", "6m", "1y", "5y"}),
+        "max_concurrent_requests": 10,
+        "response_time_avg": 2.5
+    }),
+    "risk": (RiskA2AAdapter, 8767, {
+        "role": AgentRole.RISK_ASSESSOR,
+        "capabilities": [
+            "risk_event_detection", "risk_scoring", "risk_factor_analysis",
+            "news_sentiment_analysis", "market_volatility_assessment",
+            "portfolio_risk_analysis", "stress_testing"
+        ],
+        "supported_timeframes": frozenset({"1h", "1d", "1w", "1m"}),
+        "max_concurrent_requests": 15,
+        "response_time_avg": 1.8
+    }),
+    "portfolio": (PortfolioA2AAdapter, 8768, {
+        "role": AgentRole.PORTFOLIO_MANAGER,
+        "capabilities": [
+            "portfolio_analysis", "position_management", "rebalancing",
+            "performance_tracking", "diversification_analysis",
+            "sector_allocation", "risk_metrics_calculation"
+        ],
+        "supported_timeframes": frozenset({"1d", "1w", "1m", "3m", "6m", "1y"}),
+        "max_concurrent_requests": 8,
+        "response_time_avg": 3.2
+    }),
+}
+
 class A2AIntegrationManager:
     """A2A 연동 관리자"""
     
-    def __init__(self):
+    PORTFOLIO_CACHE_TTL = 60.0  # 초
+    
+    def __init__(self, max_concurrent_analyses: int = 8):
         self.adapters = {}
         self.initialized = False
         self.registry_endpoint = "ws://localhost:8765/registry"
+        # 피어 간 합의된 WebSocket 프레임 포맷 ("json" | "msgpack")
+        self.wire_format = os.getenv("A2A_WIRE_FORMAT", "json")
+        # 진행 중인 사용자 무관 분석 (ticker, analysis_type) -> Task, 동시 동일 요청을 하나로 합침
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        # 동시에 진행되는 협업 분석 수 제한 (배치 요청 등 팬아웃 시 이벤트 루프/어댑터 과부하 방지)
+        self._analysis_semaphore = asyncio.Semaphore(max_concurrent_analyses)
+        # user_id -> (캐시 시각 monotonic, 포트폴리오 데이터), 포트폴리오 변경 시 무효화
+        self._portfolio_cache: Dict[str, tuple] = {}
+        portfolio_manager.add_change_listener(self.invalidate_portfolio_cache)
         
     async def initialize(self):
         """A2A 연동 초기화"""
@@ -43,68 +104,27 @@ class A2AIntegrationManager:
             return
             
         try:
-            # 1. 투자 분석 에이전트 어댑터 초기화
-            investment_adapter = InvestmentA2AAdapter("websocket")
-            investment_capabilities = AgentCapability(
-                role=AgentRole.INVESTMENT_ANALYST,
-                capabilities=[
-                    "stock_analysis", "technical_analysis", "fundamental_analysis",
-                    "investment_recommendations", "portfolio_optimization",
-                    "risk_assessment", "market_research"
-                ],
-                supported_tickers=["AAPL", "GOOGL", "MSFT", "AMZN", "TSLA", "META", "NVDA", "NFLX"],
-                supported_timeframes=["1d", "1w", "1m", "3m", "6m", "1y", "5y"],
-                max_concurrent_requests=10,
-                response_time_avg=2.5,
-                version="1.0.0"
-            )
-            investment_adapter.register_capabilities(investment_capabilities)
-            self.adapters["investment"] = investment_adapter
-            
-            # 2. 리스크 분석 에이전트 어댑터 초기화
-            risk_adapter = RiskA2AAdapter("websocket")
-            risk_capabilities = AgentCapability(
-                role=AgentRole.RISK_ASSESSOR,
-                capabilities=[
-                    "risk_event_detection", "risk_scoring", "risk_factor_analysis",
-                    "news_sentiment_analysis", "market_volatility_assessment",
-                    "portfolio_risk_analysis", "stress_testing"
-                ],
-                supported_tickers=["AAPL", "GOOGL", "MSFT", "AMZN", "TSLA", "META", "NVDA", "NFLX"],
-                supported_timeframes=["1h", "1d", "1w", "1m"],
-                max_concurrent_requests=15,
-                response_time_avg=1.8,
-                version="1.0.0"
-            )
-            risk_adapter.register_capabilities(risk_capabilities)
-            self.adapters["risk"] = risk_adapter
-            
-            # 3. 포트폴리오 관리 에이전트 어댑터 초기화
-            portfolio_adapter = PortfolioA2AAdapter("websocket")
-            portfolio_capabilities = AgentCapability(
-                role=AgentRole.PORTFOLIO_MANAGER,
-                capabilities=[
-                    "portfolio_analysis", "position_management", "rebalancing",
-                    "performance_tracking", "diversification_analysis",
-                    "sector_allocation", "risk_metrics_calculation"
-                ],
-                supported_tickers=["AAPL", "GOOGL", "MSFT", "AMZN", "TSLA", "META", "NVDA", "NFLX"],
-                supported_timeframes=["1d", "1w", "1m", "3m", "6m", "1y"],
-                max_concurrent_requests=8,
-                response_time_avg=3.2,
-                version="1.0.0"
-            )
-            portfolio_adapter.register_capabilities(portfolio_capabilities)
-            self.adapters["portfolio"] = portfolio_adapter
-            
-            # 4. 각 어댑터 서버 시작
-            ports = {"investment": 8766, "risk": 8767, "portfolio": 8768}
+            # 1. 어댑터 생성 및 능력 등록
+            for adapter_name, (adapter_cls, _, capability_spec) in _ADAPTER_SPECS.items():
+                adapter = adapter_cls("websocket", self.wire_format)
+                adapter.register_capabilities(AgentCapability(
+                    supported_tickers=_SUPPORTED_TICKERS,
+                    version="1.0.0",
+                    **capability_spec
+                ))
+                self.adapters[adapter_name] = adapter
             
-            for adapter_name, adapter in self.adapters.items():
-                port = ports[adapter_name]
+            # 2. 각 어댑터 서버 동시 시작
+            async def _start(adapter_name: str, adapter):
+                port = _ADAPTER_SPECS[adapter_name][1]
                 await adapter.start_server(port)
                 logger.info(f"{adapter_name} adapter started on port {port}")
             
+            # 하나라도 실패하면 나머지 시작 작업은 취소됨
+            async with asyncio.TaskGroup() as tg:
+                for adapter_name, adapter in self.adapters.items():
+                    tg.create_task(_start(adapter_name, adapter))
+            
             self.initialized = True
             logger.info("A2A integration initialized successfully")
             
@@ -114,27 +134,22 @@ class A2AIntegrationManager:
     
     async def start_collaborative_analysis(self, ticker: str, user_id: str, 
                                          analysis_type: str = "comprehensive") -> Dict[str, Any]:
-        """다중 에이전트 협업 분석 시작"""
+        """다중 에이전트 협업 분석 시작 (최대 max_concurrent_analyses 개까지 동시 실행)"""
         if not self.initialized:
             await self.initialize()
         
+        async with self._analysis_semaphore:
+            return await self._run_collaborative_analysis(ticker, user_id, analysis_type)
+    
+    async def _run_collaborative_analysis(self, ticker: str, user_id: str,
+                                          analysis_type: str) -> Dict[str, Any]:
+        """협업 분석 실행"""
         try:
-            # 1. 각 에이전트에게 분석 요청
-            tasks = []
-            
-            # 투자 분석 요청
-            investment_task = self.adapters["investment"].request_stock_analysis(
-                "investment_agent_001", ticker, analysis_type, "1m"
-            )
-            tasks.append(("investment", investment_task))
-            
-            # 리스크 분석 요청
-            risk_task = self.adapters["risk"].request_risk_analysis(
-                "risk_agent_001", ticker, ["news", "financial_reports", "market_data"]
-            )
-            tasks.append(("risk", risk_task))
+            # 1. 투자/리스크 분석은 사용자와 무관하므로 동시 동일 요청과 공유
+            shared = self._get_shared_analysis(ticker, analysis_type)
             
             # 사용자 포트폴리오 분석 요청
+            tasks = []
             user_profile = memory_manager.get_user_profile(user_id)
             if user_profile:
                 portfolio_data = self._get_user_portfolio_data(user_id)
@@ -143,20 +158,12 @@ class A2AIntegrationManager:
                 )
                 tasks.append(("portfolio", portfolio_task))
             
-            # 모든 분석 결과 수집
-            results = {}
-            for agent_name, task in tasks:
-                try:
-                    result = await asyncio.wait_for(task, timeout=30)
-                    if result:
-                        results[agent_name] = result
-                        logger.info(f"{agent_name} analysis completed")
-                    else:
-                        logger.warning(f"{agent_name} analysis failed or timed out")
-                except asyncio.TimeoutError:
-                    logger.warning(f"{agent_name} analysis timed out")
-                except Exception as e:
-                    logger.error(f"{agent_name} analysis error: {e}")
+            # 모든 분석 결과 동시 수집 (공유 결과는 호출자별로 복사, 한 호출자의 취소가 공유 작업을 취소하지 않도록 shield)
+            shared_results, user_results = await asyncio.gather(
+                asyncio.shield(shared), self._collect_results(tasks)
+            )
+            results = dict(shared_results)
+            results.update(user_results)
             
             # 2. 결과 통합 및 종합 분석
             integrated_analysis = self._integrate_analysis_results(ticker, results)
@@ -167,66 +174,119 @@ class A2AIntegrationManager:
             logger.error(f"Collaborative analysis failed: {e}")
             return {"error": str(e)}
     
+    def _get_shared_analysis(self, ticker: str, analysis_type: str) -> asyncio.Task:
+        """진행 중인 동일 (ticker, analysis_type) 분석이 있으면 재사용, 없으면 새로 시작"""
+        key = (ticker, analysis_type)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_shared_analyses(ticker, analysis_type))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._discard_inflight(key, done))
+        return task
+    
+    def _discard_inflight(self, key: tuple, task: asyncio.Task):
+        """완료된 분석 태스크 제거 (reset 이후 같은 키로 시작된 새 태스크는 유지)"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+    
+    async def _run_shared_analyses(self, ticker: str, analysis_type: str) -> Dict[str, Any]:
+        """사용자와 무관한 투자/리스크 분석 실행"""
+        # 이 태스크(와 하위 요청 태스크)가 보낸 요청을 reset()이 구분할 수 있도록 소유자 표시
+        request_owner.set(asyncio.current_task())
+        tasks = []
+        
+        # 투자 분석 요청
+        investment_task = self.adapters["investment"].request_stock_analysis(
+            "investment_agent_001", ticker, analysis_type, "1m"
+        )
+        tasks.append(("investment", investment_task))
+        
+        # 리스크 분석 요청
+        risk_task = self.adapters["risk"].request_risk_analysis(
+            "risk_agent_001", ticker, ["news", "financial_reports", "market_data"]
+        )
+        tasks.append(("risk", risk_task))
+        
+        return await self._collect_results(tasks)
+    
+    async def _collect_results(self, tasks: List[tuple], timeout: float = 30) -> Dict[str, Any]:
+        """(에이전트 이름, 코루틴) 목록을 동시에 실행하고 공통 마감 시간 안에 끝난 결과 수집"""
+        if not tasks:
+            return {}
+        
+        task_names = {asyncio.ensure_future(coro): agent_name for agent_name, coro in tasks}
+        done, pending = await asyncio.wait(task_names, timeout=timeout)
+        
+        results = {}
+        for task, agent_name in task_names.items():  # 요청 순서 유지
+            if task in pending:
+                task.cancel()
+                logger.warning(f"{agent_name} analysis timed out")
+                continue
+            try:
+                result = task.result()
+                if result:
+                    results[agent_name] = result
+                    logger.info(f"{agent_name} analysis completed")
+                else:
+                    logger.warning(f"{agent_name} analysis failed or timed out")
+            except Exception as e:
+                logger.error(f"{agent_name} analysis error: {e}")
+        return results
+    
+    def invalidate_portfolio_cache(self, user_id: str):
+        """사용자 포트폴리오 캐시 무효화"""
+        self._portfolio_cache.pop(user_id, None)
+    
     def _get_user_portfolio_data(self, user_id: str) -> Dict[str, Any]:
-        """사용자 포트폴리오 데이터 추출"""
+        """사용자 포트폴리오 데이터 추출 (PORTFOLIO_CACHE_TTL 동안 캐시)"""
+        cached = self._portfolio_cache.get(user_id)
+        if cached and time.monotonic() - cached[0] < self.PORTFOLIO_CACHE_TTL:
+            return cached[1]
+        
         try:
             positions = portfolio_manager.get_positions_list(user_id)
             summary = portfolio_manager.get_portfolio_summary(user_id)
             
-            return {
+            data = {
                 "positions": positions,
                 "summary": summary,
                 "user_id": user_id
             }
+            self._portfolio_cache[user_id] = (time.monotonic(), data)
+            return data
         except Exception as e:
             logger.error(f"Failed to get portfolio data: {e}")
             return {"positions": [], "summary": {}, "user_id": user_id}
     
     def _integrate_analysis_results(self, ticker: str, results: Dict[str, Any]) -> Dict[str, Any]:
         """분석 결과 통합"""
+        # 에이전트별 결과는 이름으로 한 번씩만 조회
+        investment_data = results.get("investment", {})
+        risk_data = results.get("risk", {})
+        portfolio_data = results.get("portfolio", {})
+        
+        # 가중 합산 (없는 점수는 0), 리스크 점수는 반대로 변환 (높은 리스크 = 낮은 점수)
+        score = investment_data.get("overall_score", 0) * 0.4 + portfolio_data.get("overall_score", 0) * 0.3
+        if "overall_risk_score" in risk_data:
+            score -= (100 - risk_data["overall_risk_score"]) * 0.3
+        
         integrated = {
             "ticker": ticker,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": format_timestamp_ns(time.time_ns()),
             "analysis_type": "collaborative",
             "agents_used": list(results.keys()),
-            "integrated_score": 0.0,
-            "recommendations": [],
-            "risk_assessment": {},
-            "investment_analysis": {},
-            "portfolio_impact": {},
+            "integrated_score": score,
+            # 종합 추천 생성
+            "recommendations": self._generate_integrated_recommendations(
+                score, risk_data, investment_data
+            ),
+            "risk_assessment": risk_data,
+            "investment_analysis": investment_data,
+            "portfolio_impact": portfolio_data,
             "confidence_score": 0.0
         }
         
-        # 투자 분석 결과 통합
-        if "investment" in results:
-            investment_data = results["investment"]
-            integrated["investment_analysis"] = investment_data
-            if "overall_score" in investment_data:
-                integrated["integrated_score"] += investment_data["overall_score"] * 0.4
-        
-        # 리스크 분석 결과 통합
-        if "risk" in results:
-            risk_data = results["risk"]
-            integrated["risk_assessment"] = risk_data
-            if "overall_risk_score" in risk_data:
-                # 리스크 점수를 반대로 변환 (높은 리스크 = 낮은 점수)
-                risk_penalty = (100 - risk_data["overall_risk_score"]) * 0.3
-                integrated["integrated_score"] -= risk_penalty
-        
-        # 포트폴리오 분석 결과 통합
-        if "portfolio" in results:
-            portfolio_data = results["portfolio"]
-            integrated["portfolio_impact"] = portfolio_data
-            if "overall_score" in portfolio_data:
-                integrated["integrated_score"] += portfolio_data["overall_score"] * 0.3
-        
-        # 종합 추천 생성
-        integrated["recommendations"] = self._generate_integrated_recommendations(
-            integrated["integrated_score"], 
-            integrated["risk_assessment"],
-            integrated["investment_analysis"]
-        )
-        
         # 신뢰도 계산
         integrated["confidence_score"] = self._calculate_confidence_score(results)
         
@@ -237,19 +297,8 @@ class A2AIntegrationManager:
         """통합 추천 생성"""
         recommendations = []
         
-        # 기본 추천
-        if score >= 70:
-            action = "STRONG_BUY"
-            confidence = "HIGH"
-        elif score >= 50:
-            action = "BUY"
-            confidence = "MEDIUM"
-        elif score >= 30:
-            action = "HOLD"
-            confidence = "MEDIUM"
-        else:
-            action = "SELL"
-            confidence = "HIGH"
+        # 기본 추천 (경계값은 상위 구간에 포함)
+        action, confidence = _SCORE_ACTIONS[bisect.bisect_right(_SCORE_THRESHOLDS, score)]
         
         recommendations.append({
             "action": action,
@@ -285,75 +334,88 @@ class A2AIntegrationManager:
         if not results:
             return 0.0
         
-        total_confidence = 0.0
-        count = 0
-        
-        for agent_name, result in results.items():
+        confidences = []
+        for result in results.values():
             if isinstance(result, dict):
                 # 각 에이전트의 신뢰도 추출
                 if "confidence_score" in result:
-                    total_confidence += result["confidence_score"]
-                    count += 1
+                    confidences.append(result["confidence_score"])
                 elif "confidence" in result:
                     # 문자열 신뢰도를 숫자로 변환
                     conf_str = str(result["confidence"]).lower()
-                    if "high" in conf_str:
-                        total_confidence += 0.8
-                    elif "medium" in conf_str:
-                        total_confidence += 0.6
-                    elif "low" in conf_str:
-                        total_confidence += 0.4
-                    count += 1
+                    confidences.append(next(
+                        (value for level, value in _CONFIDENCE_LEVELS if level in conf_str), 0.0
+                    ))
         
-        if count > 0:
-            return total_confidence / count
-        else:
-            return 0.5  # 기본 신뢰도
+        if confidences:
+            return float(np.mean(confidences))
+        return 0.5  # 기본 신뢰도
     
     async def register_with_external_agents(self, external_agents: List[Dict[str, Any]]):
         """외부 에이전트들과 등록"""
         if not self.initialized:
             await self.initialize()
         
-        for agent_info in external_agents:
-            agent_id = agent_info.get("agent_id")
-            endpoint = agent_info.get("endpoint")
-            role = agent_info.get("role")
-            
-            if agent_id and endpoint:
-                try:
-                    # 해당 에이전트에 연결 시도
-                    for adapter in self.adapters.values():
-                        if await adapter.transport.connect(endpoint):
-                            logger.info(f"Connected to external agent: {agent_id}")
-                            break
-                except Exception as e:
-                    logger.error(f"Failed to connect to external agent {agent_id}: {e}")
+        # 에이전트별 연결을 동시에 시도 (전체 소요 시간 = 가장 느린 연결)
+        async with asyncio.TaskGroup() as tg:
+            for agent_info in external_agents:
+                tg.create_task(self._connect_external_agent(agent_info))
+    
+    async def _connect_external_agent(self, agent_info: Dict[str, Any]):
+        """외부 에이전트 하나에 연결"""
+        agent_id = agent_info.get("agent_id")
+        endpoint = agent_info.get("endpoint")
+        
+        if agent_id and endpoint:
+            try:
+                # 해당 에이전트에 연결 시도
+                for adapter in self.adapters.values():
+                    if await adapter.transport.connect(endpoint):
+                        logger.info(f"Connected to external agent: {agent_id}")
+                        break
+            except Exception as e:
+                logger.error(f"Failed to connect to external agent {agent_id}: {e}")
+    
+    async def handle_external_request(self, request: Union[Dict[str, Any], List[Dict[str, Any]]]
+                                      ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """외부 에이전트 요청 처리 (요청 리스트는 동시에 처리하여 같은 순서로 응답)"""
+        if isinstance(request, list):
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(self._handle_one(r)) for r in request]
+            return [task.result() for task in tasks]
+        return await self._handle_one(request)
     
-    async def handle_external_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """외부 에이전트 요청 처리"""
+    async def handle_external_frame(self, frame: bytes) -> bytes:
+        """배치 프레임([u32 개수][u32 길이][JSON]*) 요청을 처리하고 같은 형식으로 응답"""
+        requests = [orjson.loads(message) for message in decode_batch_frame(frame)]
+        responses = await self.handle_external_request(requests)
+        return encode_batch_frame([orjson.dumps(response, default=str) for response in responses])
+    
+    async def _handle_one(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """외부 에이전트 단일 요청 처리"""
         try:
             request_type = request.get("type")
             ticker = request.get("ticker")
             user_id = request.get("user_id", "external_user")
             
-            if request_type == "stock_analysis" and ticker:
-                # 외부 에이전트의 주식 분석 요청 처리
-                result = await self.start_collaborative_analysis(ticker, user_id)
-                return result
-            elif request_type == "portfolio_analysis" and user_id:
-                # 외부 에이전트의 포트폴리오 분석 요청 처리
-                portfolio_data = self._get_user_portfolio_data(user_id)
-                analysis = portfolio_analyzer.analyze_portfolio(
-                    user_id, memory_manager.get_user_profile(user_id)
-                )
-                return {
-                    "user_id": user_id,
-                    "analysis": analysis,
-                    "portfolio_data": portfolio_data
-                }
-            else:
-                return {"error": "Invalid request type or missing parameters"}
+            match request_type:
+                case "stock_analysis" if ticker:
+                    # 외부 에이전트의 주식 분석 요청 처리
+                    result = await self.start_collaborative_analysis(ticker, user_id)
+                    return result
+                case "portfolio_analysis" if user_id:
+                    # 외부 에이전트의 포트폴리오 분석 요청 처리
+                    portfolio_data = self._get_user_portfolio_data(user_id)
+                    analysis = portfolio_analyzer.analyze_portfolio(
+                        user_id, memory_manager.get_user_profile(user_id)
+                    )
+                    return {
+                        "user_id": user_id,
+                        "analysis": analysis,
+                        "portfolio_data": portfolio_data
+                    }
+                case _:
+                    return {"error": "Invalid request type or missing parameters"}
                 
         except Exception as e:
             logger.error(f"Failed to handle external request: {e}")
@@ -365,28 +427,42 @@ class A2AIntegrationManager:
             "initialized": self.initialized,
             "adapters": {},
             "registry_endpoint": self.registry_endpoint,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": format_timestamp_ns(time.time_ns())
         }
         
         for adapter_name, adapter in self.adapters.items():
             status["adapters"][adapter_name] = {
                 "agent_id": adapter.agent_id,
-                "role": adapter.agent_role.value,
-                "capabilities": adapter.capabilities.role.value if adapter.capabilities else None,
+                "role": AGENT_ROLE_VALUES[adapter.agent_role],
+                "capabilities": AGENT_ROLE_VALUES[adapter.capabilities.role] if adapter.capabilities else None,
                 "pending_requests": len(adapter.pending_requests),
                 "registered_agents": len(adapter.registered_agents)
             }
         
         return status
     
+    def reset(self):
+        """연결은 유지한 채 요청/캐시 상태만 초기화 (재초기화 비용 없이 새 세션 시작)
+        
+        진행 중인 공유 분석은 취소하지 않고 맵에서만 분리하며, 그 분석이 보낸 요청도 남겨두므로
+        이미 기다리던 호출자는 온전한 결과를 받는다. 그 밖의 대기 요청은 실패(None)로 정리된다.
+        """
+        shared_tasks = {task for task in self._inflight.values() if not task.done()}
+        self._inflight.clear()
+        self._portfolio_cache.clear()
+        for adapter in self.adapters.values():
+            adapter.clear_pending_requests(keep_owners=shared_tasks)
+        logger.info("A2A integration state reset")
+    
     async def shutdown(self):
         """A2A 연동 종료"""
         logger.info("Shutting down A2A integration...")
         
         for adapter_name, adapter in self.adapters.items():
             try:
-                # 대기 중인 요청 정리
+                # 대기 중인 요청 정리 후 전송 계층 종료
                 await adapter.cleanup_expired_requests()
+                await adapter.stop()
                 logger.info(f"{adapter_name} adapter cleaned up")
             except Exception as e:
                 logger.error(f"Error cleaning up {adapter_name} adapter: {e}")
@@ -430,4 +506,13 @@ async def main():
     print("✅ A2A 연동 완료")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop이 설치되어 있으면 기본 이벤트 루프 대신 사용 (Windows 미지원)
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -5,12 +5,17 @@ A2A (AI-to-AI) 통신 프로토콜 정의
 """
 
 from __future__ import annotations
-from typing import Dict, Any, List, Optional, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Union, Callable, FrozenSet, Set
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-import json
-import uuid
+from functools import lru_cache
+import os
+import sys
+import time
+import msgpack
+import orjson
 
 class MessageType(Enum):
     """A2A 메시지 타입"""
@@ -21,6 +26,10 @@ class MessageType(Enum):
     REGISTRATION = "registration"
     CAPABILITY_QUERY = "capability_query"
     CAPABILITY_RESPONSE = "capability_response"
+    
+    def __init__(self, value: str):
+        # 선언 순서 기반 0부터의 정수 인덱스 (핸들러 디스패치 테이블용, wire 값은 문자열 유지)
+        self.ordinal = len(type(self).__members__)
 
 class AgentRole(Enum):
     """AI 에이전트 역할"""
@@ -39,49 +48,171 @@ class Priority(Enum):
     HIGH = 3
     CRITICAL = 4
 
+# 모든 피어가 수신하는 브로드캐스트 수신자 ID
+BROADCAST_ID = "*"
+
+_ID_BATCH = 64  # os.urandom 한 번으로 만드는 ID 개수
+_id_buffer = b""
+_id_offset = 0
+
+def _next_id() -> str:
+    """UUID4 형식 메시지 ID (난수는 64개분씩 미리 받아 uuid.UUID 객체 생성 없이 포맷)"""
+    global _id_buffer, _id_offset
+    if _id_offset >= len(_id_buffer):
+        _id_buffer = os.urandom(16 * _ID_BATCH)
+        _id_offset = 0
+    h = _id_buffer[_id_offset:_id_offset + 16].hex()
+    _id_offset += 16
+    # 버전(4)과 variant(10xx) 비트를 맞춰 표준 UUID4 문자열과 호환
+    return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
+
+@lru_cache(maxsize=1024)
+def _iso_seconds(seconds: int) -> str:
+    """초 단위 ISO 문자열 (같은 초에 생성된 메시지끼리 공유)"""
+    return datetime.fromtimestamp(seconds).isoformat()
+
+def format_timestamp_ns(ts_ns: int) -> str:
+    """time.time_ns() 값을 로컬 시각 ISO 문자열로 변환 (마이크로초 정밀도)"""
+    seconds, frac_ns = divmod(ts_ns, 1_000_000_000)
+    return f"{_iso_seconds(seconds)}.{frac_ns // 1000:06d}"
+
+@lru_cache(maxsize=1024)
+def _epoch_seconds(prefix: str) -> int:
+    """'YYYY-MM-DDTHH:MM:SS' 로컬 시각을 epoch 초로 변환 (같은 초끼리 공유)"""
+    return int(datetime(
+        int(prefix[0:4]), int(prefix[5:7]), int(prefix[8:10]),
+        int(prefix[11:13]), int(prefix[14:16]), int(prefix[17:19])
+    ).timestamp())
+
+def parse_timestamp_ns(value: str) -> int:
+    """ISO 문자열을 time.time_ns() 단위 정수로 변환
+    
+    format_timestamp_ns 형식(YYYY-MM-DDTHH:MM:SS.ffffff)은 고정 위치 슬라이스로 바로 파싱하고,
+    그 외 형식(타임존 포함 등)은 datetime.fromisoformat으로 처리.
+    """
+    if len(value) == 26 and value[10] == "T" and value[19] == ".":
+        try:
+            return _epoch_seconds(value[:19]) * 1_000_000_000 + int(value[20:]) * 1000
+        except ValueError:
+            pass
+    dt = datetime.fromisoformat(value)
+    return int(dt.replace(microsecond=0).timestamp()) * 1_000_000_000 + dt.microsecond * 1000
+
+@lru_cache(maxsize=None)
+def _capability_query_payload(target_role: Optional[AgentRole]) -> Dict[str, Any]:
+    """역할별 능력 조회 payload (공유 객체이므로 수정 금지)"""
+    return {"target_role": AGENT_ROLE_VALUES[target_role]} if target_role else {}
+
+def encode_batch_frame(messages: List[bytes]) -> bytes:
+    """배치 프레임 인코딩: [u32 개수][u32 길이][메시지]* (빅엔디언)"""
+    parts = [len(messages).to_bytes(4, "big")]
+    for message in messages:
+        parts.append(len(message).to_bytes(4, "big"))
+        parts.append(message)
+    return b"".join(parts)
+
+def decode_batch_frame(frame: bytes) -> List[bytes]:
+    """배치 프레임 디코딩 (메시지 bytes 목록 반환)"""
+    count = int.from_bytes(frame[:4], "big")
+    offset = 4
+    messages = []
+    for _ in range(count):
+        length = int.from_bytes(frame[offset:offset + 4], "big")
+        offset += 4
+        messages.append(frame[offset:offset + length])
+        offset += length
+    if offset > len(frame):
+        raise ValueError("Truncated batch frame")
+    return messages
+
+# wire 값 -> Enum 멤버 역매핑 (Enum(value) 생성자 호출 대신 dict 조회 한 번)
+_MESSAGE_TYPE_BY_VALUE = {m.value: m for m in MessageType}
+_PRIORITY_BY_VALUE = {p.value: p for p in Priority}
+# Enum 멤버 -> wire 값 (직렬화 시 .value 속성 조회 대신 사용, 문자열은 intern)
+_MESSAGE_TYPE_VALUE = {m: sys.intern(m.value) for m in MessageType}
+_PRIORITY_VALUE = {p: p.value for p in Priority}
+AGENT_ROLE_VALUES = {r: sys.intern(r.value) for r in AgentRole}
+
 @dataclass
 class AgentCapability:
     """에이전트 능력 정의"""
     role: AgentRole
     capabilities: List[str]
-    supported_tickers: List[str]
-    supported_timeframes: List[str]
+    supported_tickers: FrozenSet[str]  # 멤버십 검사 O(1)
+    supported_timeframes: FrozenSet[str]
     max_concurrent_requests: int
     response_time_avg: float  # 평균 응답 시간 (초)
     version: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """wire 전송용 딕셔너리 (집합은 정렬된 리스트로)"""
+        return {
+            "role": AGENT_ROLE_VALUES[self.role],
+            "capabilities": list(self.capabilities),
+            "supported_tickers": sorted(self.supported_tickers),
+            "supported_timeframes": sorted(self.supported_timeframes),
+            "max_concurrent_requests": self.max_concurrent_requests,
+            "response_time_avg": self.response_time_avg,
+            "version": self.version
+        }
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class A2AMessage:
-    """A2A 통신 메시지"""
+    """A2A 통신 메시지 (불변, 직렬화 결과를 인스턴스에 캐시)"""
     message_id: str
     sender_id: str
     receiver_id: str
     message_type: MessageType
     priority: Priority
-    timestamp: datetime
+    timestamp: int  # time.time_ns(), wire에서는 ISO 문자열
     payload: Dict[str, Any]
     correlation_id: Optional[str] = None
-    expires_at: Optional[datetime] = None
+    expires_at: Optional[int] = None  # time.time_ns() 기준
+    _cached_dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _cached_frames: Optional[Dict[str, bytes]] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
-        """딕셔너리로 변환"""
-        data = asdict(self)
-        data['timestamp'] = self.timestamp.isoformat()
-        data['message_type'] = self.message_type.value
-        data['priority'] = self.priority.value
-        if self.expires_at:
-            data['expires_at'] = self.expires_at.isoformat()
-        return data
+        """딕셔너리로 변환 (최초 1회만 생성, 반환값은 수정하지 말 것)"""
+        if self._cached_dict is None:
+            object.__setattr__(self, '_cached_dict', {
+                'message_id': self.message_id,
+                'sender_id': self.sender_id,
+                'receiver_id': self.receiver_id,
+                'message_type': _MESSAGE_TYPE_VALUE[self.message_type],
+                'priority': _PRIORITY_VALUE[self.priority],
+                'timestamp': format_timestamp_ns(self.timestamp),
+                'payload': self.payload,
+                'correlation_id': self.correlation_id,
+                'expires_at': format_timestamp_ns(self.expires_at) if self.expires_at else None,
+            })
+        return self._cached_dict
+    
+    def cached_encoding(self, key: str, encode: Callable[[A2AMessage], Union[str, bytes]]) -> Union[str, bytes]:
+        """전송 포맷별 인코딩 결과 캐시 (재전송/팬아웃 시 재직렬화 방지)"""
+        frames = self._cached_frames
+        if frames is None:
+            frames = {}
+            object.__setattr__(self, '_cached_frames', frames)
+        frame = frames.get(key)
+        if frame is None:
+            frame = frames[key] = encode(self)
+        return frame
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'A2AMessage':
-        """딕셔너리에서 생성"""
-        data['message_type'] = MessageType(data['message_type'])
-        data['priority'] = Priority(data['priority'])
-        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
-        if data.get('expires_at'):
-            data['expires_at'] = datetime.fromisoformat(data['expires_at'])
-        return cls(**data)
+        """딕셔너리에서 생성 (입력 딕셔너리는 변경하지 않음)"""
+        expires_at = data.get('expires_at')
+        return cls(
+            message_id=data['message_id'],
+            sender_id=data['sender_id'],
+            receiver_id=data['receiver_id'],
+            message_type=_MESSAGE_TYPE_BY_VALUE[data['message_type']],
+            priority=_PRIORITY_BY_VALUE[data['priority']],
+            timestamp=parse_timestamp_ns(data['timestamp']),
+            payload=data['payload'],
+            correlation_id=data.get('correlation_id'),
+            expires_at=parse_timestamp_ns(expires_at) if expires_at else None
+        )
 
 @dataclass
 class StockAnalysisRequest:
@@ -91,6 +222,16 @@ class StockAnalysisRequest:
     timeframe: str  # "1d", "1w", "1m", "3m", "1y"
     user_profile: Optional[Dict[str, Any]] = None
     additional_context: Optional[Dict[str, Any]] = None
+    
+    def to_payload(self) -> Dict[str, Any]:
+        """메시지 payload 딕셔너리 (asdict의 재귀 deepcopy 없이 직접 구성)"""
+        return {
+            "ticker": self.ticker,
+            "analysis_type": self.analysis_type,
+            "timeframe": self.timeframe,
+            "user_profile": self.user_profile,
+            "additional_context": self.additional_context
+        }
 
 @dataclass
 class StockAnalysisResponse:
@@ -110,6 +251,15 @@ class PortfolioAnalysisRequest:
     portfolio_data: Dict[str, Any]
     analysis_goals: List[str]  # ["risk_assessment", "optimization", "rebalancing"]
     constraints: Optional[Dict[str, Any]] = None
+    
+    def to_payload(self) -> Dict[str, Any]:
+        """메시지 payload 딕셔너리 (asdict의 재귀 deepcopy 없이 직접 구성)"""
+        return {
+            "user_id": self.user_id,
+            "portfolio_data": self.portfolio_data,
+            "analysis_goals": self.analysis_goals,
+            "constraints": self.constraints
+        }
 
 @dataclass
 class PortfolioAnalysisResponse:
@@ -128,6 +278,15 @@ class RiskEventRequest:
     event_sources: List[str]  # ["news", "social_media", "financial_reports", "market_data"]
     time_horizon: str  # "1h", "1d", "1w", "1m"
     severity_threshold: str  # "low", "medium", "high", "critical"
+    
+    def to_payload(self) -> Dict[str, Any]:
+        """메시지 payload 딕셔너리 (asdict의 재귀 deepcopy 없이 직접 구성)"""
+        return {
+            "ticker": self.ticker,
+            "event_sources": self.event_sources,
+            "time_horizon": self.time_horizon,
+            "severity_threshold": self.severity_threshold
+        }
 
 @dataclass
 class RiskEventResponse:
@@ -143,23 +302,67 @@ class RiskEventResponse:
 class A2AProtocol:
     """A2A 통신 프로토콜 관리"""
     
+    AGENT_TTL = 600.0  # 재등록 없이 이 시간(초)이 지난 에이전트는 등록 해제
+    
     def __init__(self, agent_id: str, agent_role: AgentRole):
         self.agent_id = agent_id
         self.agent_role = agent_role
         self.capabilities = None
-        self.registered_agents = {}
+        self.capabilities_payload: Optional[Dict[str, Any]] = None  # 등록 시 한 번 생성 (수정 금지)
+        self._registration_message: Optional[A2AMessage] = None  # 능력 재등록 시 무효화
+        self.registered_agents: Dict[str, AgentCapability] = {}
+        self._by_role: Dict[AgentRole, Set[str]] = defaultdict(set)
+        # agent_id -> 마지막 등록 monotonic 시각 (오래된 순서, TTL 만료 시 앞에서부터 제거)
+        self._registered_at: "OrderedDict[str, float]" = OrderedDict()
+    
+    def register_agent(self, agent_id: str, capabilities: AgentCapability):
+        """에이전트 등록 (역할 인덱스 함께 갱신, 재등록 시 TTL 갱신)"""
+        now = time.monotonic()
+        self.expire_agents(now)
+        
+        previous = self.registered_agents.get(agent_id)
+        if previous is not None and previous.role is not capabilities.role:
+            self._by_role[previous.role].discard(agent_id)
+        
+        self.registered_agents[agent_id] = capabilities
+        self._by_role[capabilities.role].add(agent_id)
+        self._registered_at[agent_id] = now
+        self._registered_at.move_to_end(agent_id)
+    
+    def unregister_agent(self, agent_id: str) -> Optional[AgentCapability]:
+        """에이전트 등록 해제 (역할 인덱스에서도 제거)"""
+        capabilities = self.registered_agents.pop(agent_id, None)
+        self._registered_at.pop(agent_id, None)
+        if capabilities is not None:
+            self._by_role[capabilities.role].discard(agent_id)
+        return capabilities
+    
+    def expire_agents(self, now: Optional[float] = None):
+        """AGENT_TTL 동안 재등록되지 않은 에이전트 제거"""
+        deadline = (time.monotonic() if now is None else now) - self.AGENT_TTL
+        registered_at = self._registered_at
+        while registered_at:
+            agent_id, timestamp = next(iter(registered_at.items()))
+            if timestamp >= deadline:
+                break
+            self.unregister_agent(agent_id)
+    
+    def get_agents_by_role(self, role: AgentRole) -> Set[str]:
+        """역할별 등록 에이전트 ID 조회 (내부 인덱스이므로 수정 금지)"""
+        self.expire_agents()
+        return self._by_role.get(role, set())
     
     def create_message(self, receiver_id: str, message_type: MessageType, 
                       payload: Dict[str, Any], priority: Priority = Priority.NORMAL,
                       correlation_id: Optional[str] = None) -> A2AMessage:
         """메시지 생성"""
         return A2AMessage(
-            message_id=str(uuid.uuid4()),
+            message_id=_next_id(),
             sender_id=self.agent_id,
             receiver_id=receiver_id,
             message_type=message_type,
             priority=priority,
-            timestamp=datetime.now(),
+            timestamp=time.time_ns(),
             payload=payload,
             correlation_id=correlation_id
         )
@@ -178,7 +381,7 @@ class A2AProtocol:
         return self.create_message(
             receiver_id=receiver_id,
             message_type=MessageType.REQUEST,
-            payload=asdict(request),
+            payload=request.to_payload(),
             priority=Priority.HIGH
         )
     
@@ -195,7 +398,7 @@ class A2AProtocol:
         return self.create_message(
             receiver_id=receiver_id,
             message_type=MessageType.REQUEST,
-            payload=asdict(request),
+            payload=request.to_payload(),
             priority=Priority.HIGH
         )
     
@@ -216,7 +419,7 @@ class A2AProtocol:
         return self.create_message(
             receiver_id=receiver_id,
             message_type=MessageType.REQUEST,
-            payload=asdict(request),
+            payload=request.to_payload(),
             priority=Priority.HIGH
         )
     
@@ -224,12 +427,12 @@ class A2AProtocol:
                        response_data: Dict[str, Any]) -> A2AMessage:
         """응답 메시지 생성"""
         return A2AMessage(
-            message_id=str(uuid.uuid4()),
+            message_id=_next_id(),
             sender_id=self.agent_id,
             receiver_id=original_message.sender_id,
             message_type=MessageType.RESPONSE,
             priority=original_message.priority,
-            timestamp=datetime.now(),
+            timestamp=time.time_ns(),
             payload=response_data,
             correlation_id=original_message.message_id
         )
@@ -238,12 +441,12 @@ class A2AProtocol:
                             error_message: str, error_code: str = "UNKNOWN_ERROR") -> A2AMessage:
         """에러 응답 생성"""
         return A2AMessage(
-            message_id=str(uuid.uuid4()),
+            message_id=_next_id(),
             sender_id=self.agent_id,
             receiver_id=original_message.sender_id,
             message_type=MessageType.ERROR,
             priority=Priority.HIGH,
-            timestamp=datetime.now(),
+            timestamp=time.time_ns(),
             payload={
                 "error_code": error_code,
                 "error_message": error_message,
@@ -252,41 +455,51 @@ class A2AProtocol:
             correlation_id=original_message.message_id
         )
     
-    def serialize_message(self, message: A2AMessage) -> str:
-        """메시지를 JSON 문자열로 직렬화"""
-        return json.dumps(message.to_dict(), ensure_ascii=False, indent=2)
+    def serialize_message(self, message: A2AMessage, wire_format: str = "msgpack") -> bytes:
+        """메시지 직렬화 (WebSocket에 바로 보낼 수 있는 bytes)
+        
+        - "msgpack": 4바이트 빅엔디언 길이 프리픽스 + MessagePack 바이트 (에이전트 간 기본값)
+        - "json": UTF-8 JSON (orjson, 외부 API 경계용)
+        """
+        if wire_format == "msgpack":
+            body = msgpack.packb(message.to_dict(), use_bin_type=True)
+            return len(body).to_bytes(4, "big") + body
+        return orjson.dumps(message.to_dict(), option=orjson.OPT_NON_STR_KEYS)
     
-    def deserialize_message(self, message_str: str) -> A2AMessage:
-        """JSON 문자열을 메시지로 역직렬화"""
-        data = json.loads(message_str)
-        return A2AMessage.from_dict(data)
+    def deserialize_message(self, data: Union[str, bytes], wire_format: str = "msgpack") -> A2AMessage:
+        """직렬화된 메시지를 역직렬화 (JSON은 str/bytes 모두 허용)"""
+        if wire_format == "msgpack":
+            length = int.from_bytes(data[:4], "big")
+            return A2AMessage.from_dict(msgpack.unpackb(data[4:4 + length], raw=False))
+        return A2AMessage.from_dict(orjson.loads(data))
     
     def register_capabilities(self, capabilities: AgentCapability):
         """에이전트 능력 등록"""
         self.capabilities = capabilities
+        self.capabilities_payload = capabilities.to_dict()
+        self._registration_message = None
+        self.register_agent(self.agent_id, capabilities)
     
     def get_registration_message(self) -> A2AMessage:
-        """등록 메시지 생성"""
+        """등록 메시지 (능력이 바뀌기 전까지 같은 메시지를 재사용하여 전송 포맷별 인코딩도 한 번만 수행)"""
         if not self.capabilities:
             raise ValueError("Capabilities must be registered first")
         
-        return self.create_message(
-            receiver_id="registry",
-            message_type=MessageType.REGISTRATION,
-            payload=asdict(self.capabilities),
-            priority=Priority.NORMAL
-        )
+        if self._registration_message is None:
+            self._registration_message = self.create_message(
+                receiver_id="registry",
+                message_type=MessageType.REGISTRATION,
+                payload=self.capabilities_payload,
+                priority=Priority.NORMAL
+            )
+        return self._registration_message
     
     def get_capability_query_message(self, target_role: Optional[AgentRole] = None) -> A2AMessage:
         """능력 조회 메시지 생성"""
-        payload = {}
-        if target_role:
-            payload["target_role"] = target_role.value
-        
         return self.create_message(
             receiver_id="registry",
             message_type=MessageType.CAPABILITY_QUERY,
-            payload=payload,
+            payload=_capability_query_payload(target_role),
             priority=Priority.LOW
         )
 
@@ -1,11 +1,20 @@
 """
 Agents 모듈 - AI 에이전트들
+
+각 모듈은 처음 접근할 때 로드 (PEP 562). MCP 서버 하나만 필요한 경우
+LangChain/LangGraph 등 다른 에이전트의 무거운 의존성을 임포트하지 않는다.
 """
 
-from .agent_graph import InvestmentAgent, investment_agent
-from .mcp_yfinance_server import mcp as yfinance_mcp
-from .mcp_risk_event_server import mcp as risk_mcp
-from .cursor_mcp_server import mcp as cursor_mcp
+import importlib
+
+# 공개 이름 -> (모듈, 속성)
+_LAZY_ATTRS = {
+    'InvestmentAgent': ('.agent_graph', 'InvestmentAgent'),
+    'investment_agent': ('.agent_graph', 'investment_agent'),
+    'yfinance_mcp': ('.mcp_yfinance_server', 'mcp'),
+    'risk_mcp': ('.mcp_risk_event_server', 'mcp'),
+    'cursor_mcp': ('.cursor_mcp_server', 'mcp'),
+}
 
 __all__ = [
     'InvestmentAgent',
@@ -14,3 +23,15 @@ __all__ = [
     'risk_mcp', 
     'cursor_mcp'
 ]
+
+def __getattr__(name):
+    try:
+        module_name, attr = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_name, __name__), attr)
+    globals()[name] = value  # 이후 접근은 모듈 속성으로 바로 조회
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
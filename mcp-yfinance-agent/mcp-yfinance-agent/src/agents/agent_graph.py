@@ -1,9 +1,8 @@
 import asyncio
-from langchain.chat_models import init_chat_model
-from langgraph.prebuilt import create_react_agent
-from langchain_mcp_adapters.client import MultiServerMCPClient
+import re
+from functools import lru_cache
 from config import Config
-from typing import Literal, Dict, Any, Optional
+from typing import Literal, Dict, Any, Optional, AsyncIterator, Tuple
 from memory_manager import memory_manager
 from personalized_analyzer import PersonalizedStockAnalyzer, BuySellRecommendationEngine
 from investment_profile import InvestmentProfile
@@ -11,20 +10,81 @@ from investment_profile import InvestmentProfile
 # 환경변수 검증
 Config.validate()
 
+# 종목 코드 패턴: 대문자 1-5자 ($AAPL 형태도 '$' 뒤 단어 경계로 함께 매칭)
+_TICKER_RE = re.compile(r'\b([A-Z]{1,5})\b')
+_COMMON_TICKERS = frozenset({'AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA', 'META', 'NVDA', 'NFLX'})
+
+@lru_cache(maxsize=1024)
+def _render_profile_info(risk_tolerance: str, investment_horizon: str, trading_style: str,
+                         preferred_sectors: tuple, position_limits: Optional[tuple]) -> str:
+    """프롬프트의 투자 성향 블록 (필드 값이 캐시 키이므로 프로필이 바뀌면 새로 렌더링)"""
+    info = f"""
+사용자 투자 성향:
+- 리스크 성향: {risk_tolerance}
+- 투자 기간: {investment_horizon}
+- 거래 스타일: {trading_style}
+- 선호 섹터: {', '.join(preferred_sectors) if preferred_sectors else '없음'}
+"""
+    if position_limits:
+        max_position_size, stop_loss_tolerance, take_profit_target = position_limits
+        info += f"""- 최대 포지션 크기: {max_position_size}%
+- 손절매 허용 범위: {stop_loss_tolerance}%
+- 익절 목표: {take_profit_target}%
+"""
+    return info
+
+def _profile_info(profile: InvestmentProfile, with_position_limits: bool) -> str:
+    """프로필 객체에서 캐시된 투자 성향 블록 조회"""
+    return _render_profile_info(
+        profile.risk_tolerance.value,
+        profile.investment_horizon.value,
+        profile.trading_style.value,
+        profile.preferred_sectors,
+        (profile.max_position_size, profile.stop_loss_tolerance, profile.take_profit_target)
+        if with_position_limits else None
+    )
+
 class InvestmentAgent:
     """투자 성향 기반 AI 에이전트"""
     
+    # MCP 도구 목록은 프로세스 내 모든 인스턴스가 공유 (도구 탐색 RPC 1회)
+    _client = None
+    _tools = None
+    
     def __init__(self):
         self.analyzer = PersonalizedStockAnalyzer()
         self.recommendation_engine = BuySellRecommendationEngine()
         self.client = None
         self.agent = None
         self.model = None
+        # 첫 요청이 동시에 들어와도 초기화는 한 번만 수행
+        self._init_lock = asyncio.Lock()
     
     async def initialize(self):
         """에이전트 초기화"""
+        async with self._init_lock:
+            if self.agent:
+                return
+            
+            if InvestmentAgent._tools is None:
+                InvestmentAgent._client, InvestmentAgent._tools = await self._load_tools()
+            self.client = InvestmentAgent._client
+            
+            # LangChain/LangGraph는 임포트 비용이 커서 실제 초기화 시점에 로드
+            from langchain.chat_models import init_chat_model
+            from langgraph.prebuilt import create_react_agent
+            
+            # 모델 초기화 및 ReAct 에이전트 구성
+            self.model = init_chat_model(Config.LLM_ID)
+            self.agent = create_react_agent(self.model, InvestmentAgent._tools)
+    
+    @staticmethod
+    async def _load_tools():
+        """MCP 클라이언트 생성 및 도구 목록 조회"""
+        from langchain_mcp_adapters.client import MultiServerMCPClient
+        
         # MCP 서버 등록: stdio로 로컬 파이썬 스크립트 실행
-        self.client = MultiServerMCPClient({
+        client = MultiServerMCPClient({
             "yfinance": {
                 "command": "python",
                 "args": ["./src/mcp_yfinance_server.py"],
@@ -36,11 +96,7 @@ class InvestmentAgent:
                 "transport": "stdio",
             }
         })
-        tools = await self.client.get_tools()
-
-        # 모델 초기화 및 ReAct 에이전트 구성
-        self.model = init_chat_model(Config.LLM_ID)
-        self.agent = create_react_agent(self.model, tools)
+        return client, await client.get_tools()
     
     async def process_query(self, user_query: str, user_id: str = "default_user") -> Dict[str, Any]:
         """사용자 쿼리 처리"""
@@ -61,6 +117,35 @@ class InvestmentAgent:
         # 투자 성향 기반 분석 수행
         return await self._analyze_with_profile(user_query, user_id, profile)
     
+    async def process_query_stream(self, user_query: str, user_id: str = "default_user") -> AsyncIterator[str]:
+        """사용자 쿼리 처리 (응답 텍스트를 생성되는 대로 스트리밍)"""
+        if not self.agent:
+            await self.initialize()
+        
+        memory = memory_manager.get_memory(user_id)
+        memory.add_message("user", user_query)
+        
+        profile = memory_manager.get_user_profile(user_id)
+        
+        if not profile:
+            # 투자 성향 수집은 LLM 호출 없이 질문만 전달
+            result = await self._start_profile_collection(user_id)
+            yield result["message"]
+            if result["question"]:
+                yield "\n" + result["question"]["question"]
+            return
+        
+        agent_input, _, _ = await self._prepare_analysis(user_query, user_id, profile)
+        
+        parts = []
+        async for chunk, metadata in self.agent.astream(agent_input, stream_mode="messages"):
+            # 도구 호출 결과 등은 제외하고 에이전트(LLM) 노드가 생성한 텍스트만 전달
+            if metadata.get("langgraph_node") == "agent" and isinstance(chunk.content, str) and chunk.content:
+                parts.append(chunk.content)
+                yield chunk.content
+        
+        memory.add_message("assistant", "".join(parts))
+    
     async def _start_profile_collection(self, user_id: str) -> Dict[str, Any]:
         """투자 성향 수집 시작"""
         result = memory_manager.start_profile_collection(user_id)
@@ -78,74 +163,66 @@ class InvestmentAgent:
     async def _analyze_with_profile(self, user_query: str, user_id: str, 
                                   profile: InvestmentProfile) -> Dict[str, Any]:
         """투자 성향 기반 분석"""
+        agent_input, response_type, extras = await self._prepare_analysis(user_query, user_id, profile)
+        
+        # 에이전트 실행
+        result = await self.agent.ainvoke(agent_input)
+        
+        memory = memory_manager.get_memory(user_id)
+        memory.add_message("assistant", result["messages"][-1].content)
+        
+        return {
+            "type": response_type,
+            "content": result["messages"][-1].content,
+            **extras
+        }
+    
+    async def _prepare_analysis(self, user_query: str, user_id: str,
+                                profile: InvestmentProfile) -> Tuple[Dict[str, Any], str, Dict[str, Any]]:
+        """에이전트 입력, 응답 타입, 응답에 함께 담을 분석 정보 준비"""
         # 종목 추출 (간단한 패턴 매칭)
         ticker = self._extract_ticker(user_query)
         
         if ticker:
-            # 종목 분석 및 추천
-            analysis = self.analyzer.analyze_stock(ticker, user_id)
+            # 종목 분석 (yfinance 블로킹 I/O는 스레드에서 실행)
+            analysis = await asyncio.to_thread(self.analyzer.analyze_stock, ticker, user_id)
             if analysis:
-                # 리스크 이벤트 분석 추가
-                await self._analyze_risk_events(ticker, analysis)
-                recommendation = self.recommendation_engine.get_recommendation(ticker, user_id)
+                # 리스크 이벤트 분석과 추천 계산(분석 결과 재사용)을 동시에 수행
+                _, recommendation = await asyncio.gather(
+                    self._analyze_risk_events(ticker, analysis),
+                    asyncio.to_thread(self.recommendation_engine.get_recommendation, ticker, user_id, analysis)
+                )
                 
                 # 맞춤형 시스템 프롬프트 생성
                 personalized_prompt = self._build_personalized_prompt(profile, analysis, recommendation)
                 
-                # 에이전트 실행
-                result = await self.agent.ainvoke({
-                    "messages": [
-                        {"role": "system", "content": personalized_prompt},
-                        {"role": "user", "content": user_query},
-                    ]
-                })
-                
-                memory = memory_manager.get_memory(user_id)
-                memory.add_message("assistant", result["messages"][-1].content)
-                
-                return {
-                    "type": "analysis",
-                    "content": result["messages"][-1].content,
+                return self._agent_input(personalized_prompt, user_query), "analysis", {
                     "analysis": analysis,
                     "recommendation": recommendation,
                     "profile": profile
                 }
         
         # 일반적인 주식 정보 조회
-        result = await self.agent.ainvoke({
+        return self._agent_input(self._build_general_prompt(profile), user_query), "general", {
+            "profile": profile
+        }
+    
+    @staticmethod
+    def _agent_input(system_prompt: str, user_query: str) -> Dict[str, Any]:
+        """에이전트 입력 메시지 구성"""
+        return {
             "messages": [
-                {"role": "system", "content": self._build_general_prompt(profile)},
+                {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_query},
             ]
-        })
-        
-        memory = memory_manager.get_memory(user_id)
-        memory.add_message("assistant", result["messages"][-1].content)
-        
-        return {
-            "type": "general",
-            "content": result["messages"][-1].content,
-            "profile": profile
         }
     
     def _extract_ticker(self, query: str) -> Optional[str]:
         """쿼리에서 종목 코드 추출"""
-        import re
-        
-        # 일반적인 종목 코드 패턴
-        patterns = [
-            r'\b([A-Z]{1,5})\b',  # 대문자 1-5자
-            r'\$([A-Z]{1,5})\b',  # $AAPL 형태
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, query.upper())
-            if matches:
-                # 일반적인 종목 코드 필터링
-                common_tickers = ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA', 'META', 'NVDA', 'NFLX']
-                for match in matches:
-                    if match in common_tickers or len(match) <= 5:
-                        return match
+        for match in _TICKER_RE.findall(query.upper()):
+            # 일반적인 종목 코드 필터링
+            if match in _COMMON_TICKERS or len(match) <= 5:
+                return match
         
         return None
     
@@ -154,16 +231,8 @@ class InvestmentAgent:
         """맞춤형 시스템 프롬프트 생성"""
         base_prompt = Config.SYSTEM_PROMPT
         
-        profile_info = f"""
-사용자 투자 성향:
-- 리스크 성향: {profile.risk_tolerance.value}
-- 투자 기간: {profile.investment_horizon.value}
-- 거래 스타일: {profile.trading_style.value}
-- 선호 섹터: {', '.join(profile.preferred_sectors) if profile.preferred_sectors else '없음'}
-- 최대 포지션 크기: {profile.max_position_size}%
-- 손절매 허용 범위: {profile.stop_loss_tolerance}%
-- 익절 목표: {profile.take_profit_target}%
-
+        # 프로필 블록(세션 내 불변)을 앞에, 종목별 분석은 뒤에 두어 프롬프트 접두사를 고정
+        analysis_info = f"""
 종목 분석 결과:
 - 현재가: ${analysis.current_price:.2f} {analysis.currency}
 - 종합 점수: {analysis.overall_score:.1f}/100
@@ -187,19 +256,15 @@ class InvestmentAgent:
 - 고위험 이벤트: {analysis.risk_event_analysis.high_risk_events_count if analysis.risk_event_analysis else 0}개
 """
         
+        profile_info = _profile_info(profile, True) + analysis_info
+        
         return f"{base_prompt}\n\n{profile_info}\n\n위 정보를 바탕으로 사용자의 투자 성향에 맞는 맞춤형 조언을 제공하세요."
     
     def _build_general_prompt(self, profile: InvestmentProfile) -> str:
         """일반적인 시스템 프롬프트 생성"""
         base_prompt = Config.SYSTEM_PROMPT
         
-        profile_info = f"""
-사용자 투자 성향:
-- 리스크 성향: {profile.risk_tolerance.value}
-- 투자 기간: {profile.investment_horizon.value}
-- 거래 스타일: {profile.trading_style.value}
-- 선호 섹터: {', '.join(profile.preferred_sectors) if profile.preferred_sectors else '없음'}
-"""
+        profile_info = _profile_info(profile, False)
         
         return f"{base_prompt}\n\n{profile_info}\n\n사용자의 투자 성향을 고려하여 조언을 제공하세요."
     
@@ -234,23 +299,26 @@ async def main(user_query: str = None, user_id: str = "default_user"):
     result = await investment_agent.process_query(user_query or "AAPL 분석해줘", user_id)
     return result
 
-if __name__ == "__main__":
-    result = asyncio.run(main())
-    print(result)
-
 
 #  동적으로 페르소나 / 리스크 레벨 바꾸기
+PERSONA_LINES = {
+    "swing": "너는 '스윙 트레이더'로 3일~3주 구간을 중시한다.",
+    "intraday": "너는 '당일 트레이더'로 분·기간 단위 신속 판단을 중시한다.",
+    "position": "너는 '포지션 트레이더'로 수주~수개월 추세를 중시한다.",
+}
+RISK_LINES = {
+    "conservative": "리스크는 낮게: 손절은 타이트, 포지션은 보수적으로.",
+    "balanced": "리스크는 중간: 손절/익절 균형, 포지션 중간.",
+    "aggressive": "리스크는 높게: 손절은 넓게 허용 가능하나 근거 필수.",
+}
+
+# 3 x 3 조합뿐이고 Config.SYSTEM_PROMPT는 임포트 이후 바뀌지 않으므로 결과를 캐시
+@lru_cache(maxsize=None)
 def build_prompt(persona: Literal["swing","intraday","position"]="swing",
                  risk: Literal["conservative","balanced","aggressive"]="conservative") -> str:
-    base = Config.SYSTEM_PROMPT
-    persona_line = {
-        "swing": "너는 '스윙 트레이더'로 3일~3주 구간을 중시한다.",
-        "intraday": "너는 '당일 트레이더'로 분·기간 단위 신속 판단을 중시한다.",
-        "position": "너는 '포지션 트레이더'로 수주~수개월 추세를 중시한다.",
-    }[persona]
-    risk_line = {
-        "conservative": "리스크는 낮게: 손절은 타이트, 포지션은 보수적으로.",
-        "balanced": "리스크는 중간: 손절/익절 균형, 포지션 중간.",
-        "aggressive": "리스크는 높게: 손절은 넓게 허용 가능하나 근거 필수.",
-    }[risk]
-    return f"{persona_line}\n{risk_line}\n{base}"
\ No newline at end of file
+    return "\n".join((PERSONA_LINES[persona], RISK_LINES[risk], Config.SYSTEM_PROMPT))
+
+
+if __name__ == "__main__":
+    result = asyncio.run(main())
+    print(result)
@@ -162,7 +162,7 @@ def get_user_profile(user_id: str = "default_user") -> Dict[str, Any]:
                 "risk_tolerance": profile.risk_tolerance.value,
                 "investment_horizon": profile.investment_horizon.value,
                 "trading_style": profile.trading_style.value,
-                "preferred_sectors": profile.preferred_sectors,
+                "preferred_sectors": list(profile.preferred_sectors),
                 "max_position_size": profile.max_position_size,
                 "stop_loss_tolerance": profile.stop_loss_tolerance,
                 "take_profit_target": profile.take_profit_target,
@@ -8,19 +8,59 @@
 """
 
 from __future__ import annotations
-from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Optional, Callable
+from dataclasses import dataclass
 from mcp.server.fastmcp import FastMCP
 from pydantic import BaseModel
-import requests
+import asyncio
+import numpy as np
 import time
 import re
+import sys
 from datetime import datetime, timedelta
 from config import Config
 
+try:
+    import ahocorasick  # pyahocorasick (선택 의존성, 없으면 키워드별 부분 문자열 검사)
+except ImportError:
+    ahocorasick = None
+
 mcp = FastMCP("RiskEventDetector")
 
-@dataclass
+# 이벤트 타입별 기본 점수
+_EVENT_TYPE_SCORES = {
+    "financial": 70,
+    "legal": 80,
+    "market": 60,
+    "operational": 65,
+    "regulatory": 75
+}
+
+# 심각도별 가중치
+_SEVERITY_WEIGHTS = {
+    "critical": 1.0,
+    "high": 0.8,
+    "medium": 0.6,
+    "low": 0.4
+}
+
+# (이벤트 타입, 심각도)별 기본점수 * 심각도가중치 (5 x 4 조합을 미리 계산)
+_TYPE_SEVERITY_SCORES = {
+    (event_type, severity): score * weight
+    for event_type, score in _EVENT_TYPE_SCORES.items()
+    for severity, weight in _SEVERITY_WEIGHTS.items()
+}
+
+# 이벤트 타입별 리스크 팩터 설명
+_RISK_FACTOR_DESCRIPTIONS = {
+    "financial": "재무 건전성 우려",
+    "legal": "법적 리스크 존재",
+    "market": "시장 변동성 증가",
+    "operational": "운영상 문제 발생",
+    "regulatory": "규제 리스크 증가"
+}
+
+@dataclass(frozen=True, slots=True)
 class RiskEvent:
     """리스크 이벤트 정보"""
     event_type: str  # "financial", "legal", "market", "operational", "regulatory"
@@ -33,7 +73,7 @@ class RiskEvent:
     keywords: List[str]
     risk_score: int   # 0-100
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RiskAnalysis:
     """리스크 분석 결과"""
     ticker: str
@@ -46,10 +86,44 @@ class RiskAnalysis:
     recommendation: str
     last_updated: str
 
+def _event_to_dict(event: RiskEvent) -> Dict:
+    """RiskEvent를 딕셔너리로 변환 (asdict의 재귀 탐색 없이 필드를 직접 복사)"""
+    return {
+        "event_type": event.event_type,
+        "severity": event.severity,
+        "title": event.title,
+        "description": event.description,
+        "source": event.source,
+        "published_date": event.published_date,
+        "confidence": event.confidence,
+        "keywords": list(event.keywords),
+        "risk_score": event.risk_score
+    }
+
+def _analysis_to_dict(analysis: RiskAnalysis) -> Dict:
+    """RiskAnalysis를 딕셔너리로 변환 (이벤트 목록 포함, 한 번에 생성)"""
+    return {
+        "ticker": analysis.ticker,
+        "overall_risk_score": analysis.overall_risk_score,
+        "risk_level": analysis.risk_level,
+        "total_events": analysis.total_events,
+        "high_risk_events": analysis.high_risk_events,
+        "recent_events": [_event_to_dict(event) for event in analysis.recent_events],
+        "risk_factors": list(analysis.risk_factors),
+        "recommendation": analysis.recommendation,
+        "last_updated": analysis.last_updated
+    }
+
 class RiskEventDetector:
     """리스크 이벤트 감지기"""
     
+    CACHE_TTL = 60.0  # 초
+    CACHE_MAXSIZE = 1024
+    
     def __init__(self):
+        # ticker -> (캐시 시각 monotonic, 분석 결과), MCP 도구 간 결과 공유
+        self._cache: Dict[str, tuple] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
         self.risk_keywords = {
             "financial": [
                 "손실", "적자", "매출 감소", "이익 감소", "부채 증가", "현금 부족",
@@ -79,18 +153,81 @@ class RiskEventDetector:
             "medium": ["주의", "관심", "caution", "concern"],
             "low": ["소폭", "일시적", "minor", "temporary"]
         }
+        
+        # 분류 시 키워드마다 .lower() 하지 않도록 소문자(intern) 키워드 테이블을 한 번만 생성
+        self._keyword_tables = {
+            bucket: {category: tuple(sys.intern(keyword.lower()) for keyword in keywords)
+                     for category, keywords in table.items()}
+            for bucket, table in (("type", self.risk_keywords), ("severity", self.severity_keywords))
+        }
+        self._automaton = self._build_automaton()
+        # 오토마톤을 쓸 수 없으면 분류별 키워드를 하나의 정규식 alternation으로 컴파일
+        self._keyword_patterns = None if self._automaton is not None else {
+            bucket: {category: re.compile("|".join(map(re.escape, keywords)))
+                     for category, keywords in table.items()}
+            for bucket, table in self._keyword_tables.items()
+        }
+    
+    def _build_automaton(self):
+        """모든 리스크/심각도 키워드를 한 번의 텍스트 스캔으로 찾는 Aho-Corasick 오토마톤 생성"""
+        if ahocorasick is None:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for bucket, table in self._keyword_tables.items():
+            for category, keywords in table.items():
+                for keyword in keywords:
+                    # 같은 키워드가 여러 분류에 속할 수 있으므로 (bucket, category) 튜플을 누적
+                    automaton.add_word(keyword, automaton.get(keyword, ()) + ((bucket, category),))
+        automaton.make_automaton()
+        return automaton
     
-    def analyze_ticker_risk(self, ticker: str) -> RiskAnalysis:
+    def _category_matcher(self, text: str) -> Callable[[str, str], bool]:
+        """(bucket, category) 키워드가 텍스트에 등장하는지 판정하는 함수 반환"""
+        if self._automaton is not None:
+            # 한 번의 스캔으로 매칭된 분류를 모두 모아 둠
+            matched = set()
+            for _, hits in self._automaton.iter(text):
+                matched.update(hits)
+            return lambda bucket, category: (bucket, category) in matched
+        
+        # 오토마톤이 없으면 필요한 분류만 분류별 정규식 한 번의 C 레벨 스캔으로 검사
+        patterns = self._keyword_patterns
+        return lambda bucket, category: patterns[bucket][category].search(text) is not None
+    
+    async def get_analysis(self, ticker: str) -> RiskAnalysis:
+        """CACHE_TTL 동안 캐시된 리스크 분석 조회 (같은 종목 동시 요청은 한 번만 분석)"""
+        cached = self._cache.get(ticker)
+        if cached and time.monotonic() - cached[0] < self.CACHE_TTL:
+            return cached[1]
+        
+        async with self._locks.setdefault(ticker, asyncio.Lock()):
+            # 대기하는 동안 다른 요청이 채운 결과 재확인
+            cached = self._cache.get(ticker)
+            if cached and time.monotonic() - cached[0] < self.CACHE_TTL:
+                return cached[1]
+            
+            analysis = await self.analyze_ticker_risk(ticker)
+            self._cache.pop(ticker, None)
+            self._cache[ticker] = (time.monotonic(), analysis)
+            if len(self._cache) > self.CACHE_MAXSIZE:
+                # 가장 오래 갱신되지 않은 종목 제거
+                evicted = next(iter(self._cache))
+                del self._cache[evicted]
+                self._locks.pop(evicted, None)
+            return analysis
+    
+    async def analyze_ticker_risk(self, ticker: str) -> RiskAnalysis:
         """종목 리스크 분석"""
+        # 이벤트 날짜와 갱신 시각이 모두 같은 기준 시각을 사용
+        now = datetime.now()
         try:
-            # 1. 뉴스 데이터 수집
-            news_events = self._collect_news_events(ticker)
-            
-            # 2. 공시 데이터 수집 (DART API 대신 시뮬레이션)
-            disclosure_events = self._collect_disclosure_events(ticker)
-            
-            # 3. 소셜 미디어 데이터 수집 (시뮬레이션)
-            social_events = self._collect_social_events(ticker)
+            # 1~3. 뉴스 / 공시 (DART API 대신 시뮬레이션) / 소셜 미디어 데이터 동시 수집
+            news_events, disclosure_events, social_events = await asyncio.gather(
+                self._collect_news_events(ticker, now),
+                self._collect_disclosure_events(ticker, now),
+                self._collect_social_events(ticker, now)
+            )
             
             # 4. 모든 이벤트 통합
             all_events = news_events + disclosure_events + social_events
@@ -116,14 +253,14 @@ class RiskEventDetector:
                 recent_events=all_events[:5],  # 최근 5개 이벤트
                 risk_factors=risk_factors,
                 recommendation=recommendation,
-                last_updated=datetime.now().isoformat()
+                last_updated=now.isoformat()
             )
             
         except Exception as e:
             print(f"리스크 분석 중 오류: {e}")
             return self._create_default_analysis(ticker)
     
-    def _collect_news_events(self, ticker: str) -> List[RiskEvent]:
+    async def _collect_news_events(self, ticker: str, now: datetime) -> List[RiskEvent]:
         """뉴스 이벤트 수집 (시뮬레이션)"""
         # 실제 구현에서는 News API, Google News API 등을 사용
         # 여기서는 시뮬레이션 데이터 반환
@@ -133,41 +270,21 @@ class RiskEventDetector:
                 "title": f"{ticker} 실적 발표, 예상보다 낮은 매출",
                 "content": f"{ticker}의 분기 실적이 분석가 예상을 하회하며 주가 하락 우려",
                 "source": "Financial News",
-                "date": (datetime.now() - timedelta(days=2)).isoformat(),
+                "date": (now - timedelta(days=2)).isoformat(),
                 "keywords": ["실적", "매출 감소", "주가 하락"]
             },
             {
                 "title": f"{ticker} 신제품 출시 지연",
                 "content": f"{ticker}의 핵심 신제품 출시가 예정보다 3개월 지연될 예정",
                 "source": "Tech News",
-                "date": (datetime.now() - timedelta(days=5)).isoformat(),
+                "date": (now - timedelta(days=5)).isoformat(),
                 "keywords": ["출시 지연", "생산 문제"]
             }
         ]
         
-        events = []
-        for news in simulated_news:
-            event_type, severity, confidence = self._classify_news_content(
-                news["title"], news["content"], news["keywords"]
-            )
-            
-            risk_score = self._calculate_event_risk_score(event_type, severity, confidence)
-            
-            events.append(RiskEvent(
-                event_type=event_type,
-                severity=severity,
-                title=news["title"],
-                description=news["content"],
-                source=news["source"],
-                published_date=news["date"],
-                confidence=confidence,
-                keywords=news["keywords"],
-                risk_score=risk_score
-            ))
-        
-        return events
+        return self._items_to_events(simulated_news)
     
-    def _collect_disclosure_events(self, ticker: str) -> List[RiskEvent]:
+    async def _collect_disclosure_events(self, ticker: str, now: datetime) -> List[RiskEvent]:
         """공시 이벤트 수집 (시뮬레이션)"""
         # 실제 구현에서는 DART API 사용
         # 여기서는 시뮬레이션 데이터 반환
@@ -177,34 +294,14 @@ class RiskEventDetector:
                 "title": f"{ticker} 주요 주주 지분 변동 공시",
                 "content": f"{ticker}의 주요 주주가 보유 지분을 5% 감소시켰다고 공시",
                 "source": "DART",
-                "date": (datetime.now() - timedelta(days=1)).isoformat(),
+                "date": (now - timedelta(days=1)).isoformat(),
                 "keywords": ["주주", "지분 변동", "매도"]
             }
         ]
         
-        events = []
-        for disclosure in simulated_disclosures:
-            event_type, severity, confidence = self._classify_news_content(
-                disclosure["title"], disclosure["content"], disclosure["keywords"]
-            )
-            
-            risk_score = self._calculate_event_risk_score(event_type, severity, confidence)
-            
-            events.append(RiskEvent(
-                event_type=event_type,
-                severity=severity,
-                title=disclosure["title"],
-                description=disclosure["content"],
-                source=disclosure["source"],
-                published_date=disclosure["date"],
-                confidence=confidence,
-                keywords=disclosure["keywords"],
-                risk_score=risk_score
-            ))
-        
-        return events
+        return self._items_to_events(simulated_disclosures)
     
-    def _collect_social_events(self, ticker: str) -> List[RiskEvent]:
+    async def _collect_social_events(self, ticker: str, now: datetime) -> List[RiskEvent]:
         """소셜 미디어 이벤트 수집 (시뮬레이션)"""
         # 실제 구현에서는 Twitter API, Reddit API 등을 사용
         # 여기서는 시뮬레이션 데이터 반환
@@ -214,63 +311,54 @@ class RiskEventDetector:
                 "title": f"{ticker} 관련 부정적 여론 확산",
                 "content": f"소셜 미디어에서 {ticker} 관련 부정적 댓글이 급증하고 있음",
                 "source": "Social Media Monitor",
-                "date": (datetime.now() - timedelta(hours=6)).isoformat(),
+                "date": (now - timedelta(hours=6)).isoformat(),
                 "keywords": ["부정적", "여론", "댓글"]
             }
         ]
         
-        events = []
-        for social in simulated_social:
-            event_type, severity, confidence = self._classify_news_content(
-                social["title"], social["content"], social["keywords"]
-            )
-            
-            risk_score = self._calculate_event_risk_score(event_type, severity, confidence)
-            
-            events.append(RiskEvent(
-                event_type=event_type,
-                severity=severity,
-                title=social["title"],
-                description=social["content"],
-                source=social["source"],
-                published_date=social["date"],
-                confidence=confidence,
-                keywords=social["keywords"],
-                risk_score=risk_score
-            ))
+        return self._items_to_events(simulated_social)
+    
+    def _items_to_events(self, items: List[Dict]) -> List[RiskEvent]:
+        """수집 항목 목록을 리스크 이벤트 목록으로 변환"""
+        return [self._make_event(item) for item in items]
+    
+    def _make_event(self, item: Dict) -> RiskEvent:
+        """수집 항목 하나를 분류/점수화하여 리스크 이벤트 생성"""
+        event_type, severity, confidence = self._classify_news_content(
+            item["title"], item["content"], item["keywords"]
+        )
         
-        return events
+        return RiskEvent(
+            event_type=event_type,
+            severity=severity,
+            title=item["title"],
+            description=item["content"],
+            source=item["source"],
+            published_date=item["date"],
+            confidence=confidence,
+            keywords=item["keywords"],
+            risk_score=self._calculate_event_risk_score(event_type, severity, confidence)
+        )
     
     def _classify_news_content(self, title: str, content: str, keywords: List[str]) -> tuple:
         """뉴스 내용 분류"""
         text = f"{title} {content}".lower()
         
-        # 이벤트 타입 분류
-        event_type = "market"  # 기본값
-        for event_type_key, type_keywords in self.risk_keywords.items():
-            for keyword in type_keywords:
-                if keyword.lower() in text:
-                    event_type = event_type_key
-                    break
-            if event_type != "market":
-                break
+        matches = self._category_matcher(text)
         
-        # 심각도 분류
-        severity = "medium"  # 기본값
-        for severity_key, severity_keywords in self.severity_keywords.items():
-            for keyword in severity_keywords:
-                if keyword.lower() in text:
-                    severity = severity_key
-                    break
-            if severity != "medium":
-                break
+        # 이벤트 타입 분류: 정의 순서상 처음 매칭된 기본값 외 타입 (기본값 "market")
+        event_type = next(
+            (key for key in self.risk_keywords if key != "market" and matches("type", key)), "market"
+        )
+        
+        # 심각도 분류: 정의 순서상 처음 매칭된 기본값 외 심각도 (기본값 "medium")
+        severity = next(
+            (key for key in self.severity_keywords if key != "medium" and matches("severity", key)), "medium"
+        )
         
         # 신뢰도 계산 (키워드 매칭 기반)
         confidence = 0.5
-        matched_keywords = 0
-        for keyword in keywords:
-            if keyword.lower() in text:
-                matched_keywords += 1
+        matched_keywords = sum(1 for keyword in keywords if keyword.lower() in text)
         
         if matched_keywords > 0:
             confidence = min(0.9, 0.5 + (matched_keywords * 0.1))
@@ -279,28 +367,13 @@ class RiskEventDetector:
     
     def _calculate_event_risk_score(self, event_type: str, severity: str, confidence: float) -> int:
         """개별 이벤트 리스크 점수 계산"""
-        # 이벤트 타입별 기본 점수
-        type_scores = {
-            "financial": 70,
-            "legal": 80,
-            "market": 60,
-            "operational": 65,
-            "regulatory": 75
-        }
-        
-        # 심각도별 가중치
-        severity_weights = {
-            "critical": 1.0,
-            "high": 0.8,
-            "medium": 0.6,
-            "low": 0.4
-        }
-        
-        base_score = type_scores.get(event_type, 60)
-        weight = severity_weights.get(severity, 0.6)
+        weighted_score = _TYPE_SEVERITY_SCORES.get((event_type, severity))
+        if weighted_score is None:
+            # 정의되지 않은 타입/심각도는 기본값 적용
+            weighted_score = _EVENT_TYPE_SCORES.get(event_type, 60) * _SEVERITY_WEIGHTS.get(severity, 0.6)
         
         # 최종 점수 = 기본점수 * 심각도가중치 * 신뢰도
-        final_score = int(base_score * weight * confidence)
+        final_score = int(weighted_score * confidence)
         
         return min(100, max(0, final_score))
     
@@ -309,23 +382,13 @@ class RiskEventDetector:
         if not events:
             return 20  # 기본 리스크
         
-        # 가중 평균 계산 (최근 이벤트에 더 높은 가중치)
-        weighted_sum = 0
-        total_weight = 0
-        
-        for i, event in enumerate(events):
-            # 최근 이벤트일수록 높은 가중치 (지수 감소)
-            weight = 1.0 / (i + 1)
-            weighted_sum += event.risk_score * weight
-            total_weight += weight
-        
-        if total_weight > 0:
-            avg_score = weighted_sum / total_weight
-        else:
-            avg_score = 50
+        # 가중 평균 계산 (최근 이벤트일수록 높은 가중치 1/(i+1))
+        scores = np.fromiter((event.risk_score for event in events), dtype=np.float64, count=len(events))
+        weights = np.reciprocal(np.arange(1, scores.size + 1, dtype=np.float64))
+        avg_score = float(np.dot(scores, weights) / weights.sum())
         
         # 높은 리스크 이벤트가 많으면 보너스 점수
-        high_risk_count = len([e for e in events if e.risk_score >= 70])
+        high_risk_count = int(np.count_nonzero(scores >= 70))
         if high_risk_count > 0:
             avg_score += min(20, high_risk_count * 5)
         
@@ -350,18 +413,9 @@ class RiskEventDetector:
         for event in events:
             event_types.add(event.event_type)
         
-        # 이벤트 타입별 리스크 팩터 설명
-        factor_descriptions = {
-            "financial": "재무 건전성 우려",
-            "legal": "법적 리스크 존재",
-            "market": "시장 변동성 증가",
-            "operational": "운영상 문제 발생",
-            "regulatory": "규제 리스크 증가"
-        }
-        
         for event_type in event_types:
-            if event_type in factor_descriptions:
-                factors.append(factor_descriptions[event_type])
+            if event_type in _RISK_FACTOR_DESCRIPTIONS:
+                factors.append(_RISK_FACTOR_DESCRIPTIONS[event_type])
         
         return factors
     
@@ -394,7 +448,7 @@ class RiskEventDetector:
 detector = RiskEventDetector()
 
 @mcp.tool()
-def analyze_risk_events(ticker: str) -> Dict:
+async def analyze_risk_events(ticker: str) -> Dict:
     """
     종목의 리스크 이벤트를 분석하여 리스크 점수를 반환합니다.
     
@@ -404,18 +458,13 @@ def analyze_risk_events(ticker: str) -> Dict:
     Returns:
         Dict: 리스크 분석 결과
     """
-    analysis = detector.analyze_ticker_risk(ticker)
+    analysis = await detector.get_analysis(ticker)
     
     # RiskAnalysis를 딕셔너리로 변환
-    result = asdict(analysis)
-    
-    # RiskEvent 리스트도 딕셔너리로 변환
-    result['recent_events'] = [asdict(event) for event in analysis.recent_events]
-    
-    return result
+    return _analysis_to_dict(analysis)
 
 @mcp.tool()
-def get_risk_score(ticker: str) -> int:
+async def get_risk_score(ticker: str) -> int:
     """
     종목의 리스크 점수만 간단히 반환합니다.
     
@@ -425,11 +474,11 @@ def get_risk_score(ticker: str) -> int:
     Returns:
         int: 리스크 점수 (0-100)
     """
-    analysis = detector.analyze_ticker_risk(ticker)
+    analysis = await detector.get_analysis(ticker)
     return analysis.overall_risk_score
 
 @mcp.tool()
-def get_risk_events(ticker: str, limit: int = 10) -> List[Dict]:
+async def get_risk_events(ticker: str, limit: int = 10) -> List[Dict]:
     """
     종목의 리스크 이벤트 목록을 반환합니다.
     
@@ -440,11 +489,11 @@ def get_risk_events(ticker: str, limit: int = 10) -> List[Dict]:
     Returns:
         List[Dict]: 리스크 이벤트 목록
     """
-    analysis = detector.analyze_ticker_risk(ticker)
+    analysis = await detector.get_analysis(ticker)
     
     # 최근 이벤트를 제한된 수만큼 반환
     limited_events = analysis.recent_events[:limit]
-    return [asdict(event) for event in limited_events]
+    return [_event_to_dict(event) for event in limited_events]
 
 if __name__ == "__main__":
     # 표준 입출력(stdio) 트랜스포트로 실행
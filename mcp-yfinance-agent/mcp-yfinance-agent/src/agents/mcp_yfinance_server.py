@@ -4,6 +4,7 @@ from dataclasses import asdict, dataclass
 from mcp.server.fastmcp import FastMCP
 from pydantic import BaseModel
 import yfinance as yf
+import asyncio
 import time
 from config import Config
 
@@ -34,10 +35,15 @@ def safe_yf_call(func, *args, **kwargs):
             time.sleep(1)  # 재시도 전 잠시 대기
 
 @mcp.tool()
-def get_quote(ticker: str) -> Quote:
+async def get_quote(ticker: str) -> Quote:
     """
     최신 가격/통화/거래소 정보를 조회합니다.
     """
+    # yfinance는 블로킹 I/O이므로 스레드에서 실행하여 다른 도구 호출과 동시에 처리
+    return await asyncio.to_thread(_get_quote, ticker)
+
+def _get_quote(ticker: str) -> Quote:
+    """최신 시세 조회 (블로킹)"""
     t = safe_yf_call(yf.Ticker, ticker)
     # fast_info가 환경마다 dict/객체 형태가 다를 수 있어 안전 접근
     fi = getattr(t, "fast_info", {}) or {}
@@ -56,7 +62,7 @@ def get_quote(ticker: str) -> Quote:
     return Quote(ticker=ticker.upper(), price=float(price), currency=currency, exchange=exchange)
 
 @mcp.tool()
-def get_history(
+async def get_history(
     ticker: str,
     period: str = "5d",
     interval: str = "1d",
@@ -67,6 +73,10 @@ def get_history(
     period 예) 1d,5d,1mo,3mo,6mo,1y,5y,max
     interval 예) 1m,2m,5m,15m,30m,60m,90m,1d,1wk,1mo
     """
+    return await asyncio.to_thread(_get_history, ticker, period, interval, limit)
+
+def _get_history(ticker: str, period: str, interval: str, limit: int) -> List[Bar]:
+    """히스토리 OHLCV 조회 (블로킹)"""
     df = safe_yf_call(yf.Ticker(ticker).history, period=period, interval=interval)
     if df.empty:
         return []
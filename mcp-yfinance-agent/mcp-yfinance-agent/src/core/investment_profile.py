@@ -1,8 +1,10 @@
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Literal
+from dataclasses import dataclass, fields, replace
+from typing import Dict, Iterable, Optional, Set, Tuple
 from enum import Enum
-import json
 import os
+import time
+import orjson
+from urllib.parse import quote
 from datetime import datetime
 
 class RiskTolerance(Enum):
@@ -21,92 +23,238 @@ class TradingStyle(Enum):
     POSITION_TRADING = "position_trading"  # 포지션 거래
     VALUE_INVESTING = "value_investing"    # 가치 투자
 
-@dataclass
+# 값 문자열 -> Enum 멤버 (Enum(value) 조회 대신 dict 조회로 역직렬화)
+RISK_TOLERANCE_BY_VALUE = {member.value: member for member in RiskTolerance}
+INVESTMENT_HORIZON_BY_VALUE = {member.value: member for member in InvestmentHorizon}
+TRADING_STYLE_BY_VALUE = {member.value: member for member in TradingStyle}
+
+# 리스크 성향별 기본값: (최대 포지션 크기 %, 손절매 범위 %, 익절 목표 %)
+_RISK_DEFAULTS: Dict[RiskTolerance, Tuple[float, float, float]] = {
+    RiskTolerance.CONSERVATIVE: (5.0, 3.0, 6.0),
+    RiskTolerance.MODERATE: (10.0, 5.0, 10.0),
+    RiskTolerance.AGGRESSIVE: (20.0, 8.0, 15.0),
+}
+
+@dataclass(frozen=True, slots=True)
 class InvestmentProfile:
     """투자 성향 프로필"""
     user_id: str
     risk_tolerance: RiskTolerance
     investment_horizon: InvestmentHorizon
     trading_style: TradingStyle
-    preferred_sectors: List[str]  # 선호 섹터
+    preferred_sectors: Tuple[str, ...]  # 선호 섹터 (불변)
     max_position_size: float      # 최대 포지션 크기 (%)
     stop_loss_tolerance: float    # 손절매 허용 범위 (%)
     take_profit_target: float     # 익절 목표 (%)
-    created_at: datetime
-    updated_at: datetime
+    created_ts: float             # 생성 시각 (UNIX epoch 초)
+    updated_ts: float             # 수정 시각 (UNIX epoch 초)
+    
+    @property
+    def created_at(self) -> datetime:
+        """생성 시각 (datetime)"""
+        return datetime.fromtimestamp(self.created_ts)
+    
+    @property
+    def updated_at(self) -> datetime:
+        """수정 시각 (datetime)"""
+        return datetime.fromtimestamp(self.updated_ts)
     
     def to_dict(self) -> Dict:
-        """딕셔너리로 변환"""
-        data = asdict(self)
-        data['risk_tolerance'] = self.risk_tolerance.value
-        data['investment_horizon'] = self.investment_horizon.value
-        data['trading_style'] = self.trading_style.value
-        data['created_at'] = self.created_at.isoformat()
-        data['updated_at'] = self.updated_at.isoformat()
-        return data
+        """딕셔너리로 변환 (asdict의 재귀 복사 없이 직접 구성)"""
+        return {
+            'user_id': self.user_id,
+            'risk_tolerance': self.risk_tolerance.value,
+            'investment_horizon': self.investment_horizon.value,
+            'trading_style': self.trading_style.value,
+            'preferred_sectors': list(self.preferred_sectors),
+            'max_position_size': self.max_position_size,
+            'stop_loss_tolerance': self.stop_loss_tolerance,
+            'take_profit_target': self.take_profit_target,
+            # 기존 형식(ISO 8601 문자열)을 유지하고, epoch 초는 *_ts 키에 함께 저장
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'created_ts': self.created_ts,
+            'updated_ts': self.updated_ts,
+        }
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'InvestmentProfile':
         """딕셔너리에서 생성"""
-        data['risk_tolerance'] = RiskTolerance(data['risk_tolerance'])
-        data['investment_horizon'] = InvestmentHorizon(data['investment_horizon'])
-        data['trading_style'] = TradingStyle(data['trading_style'])
-        data['created_at'] = datetime.fromisoformat(data['created_at'])
-        data['updated_at'] = datetime.fromisoformat(data['updated_at'])
+        data['risk_tolerance'] = RISK_TOLERANCE_BY_VALUE[data['risk_tolerance']]
+        data['investment_horizon'] = INVESTMENT_HORIZON_BY_VALUE[data['investment_horizon']]
+        data['trading_style'] = TRADING_STYLE_BY_VALUE[data['trading_style']]
+        data['preferred_sectors'] = tuple(data['preferred_sectors'])
+        # *_ts(epoch 초)가 있으면 우선 사용하고, 없으면 created_at/updated_at에서 변환
+        created_at = data.pop('created_at', None)
+        updated_at = data.pop('updated_at', None)
+        if 'created_ts' not in data:
+            data['created_ts'] = _to_epoch(created_at)
+        if 'updated_ts' not in data:
+            data['updated_ts'] = _to_epoch(updated_at)
         return cls(**data)
 
+def _to_epoch(value) -> float:
+    """ISO 8601 문자열 또는 epoch 초를 epoch 초로 변환"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+# update_profile에서 갱신 가능한 필드 이름
+_PROFILE_FIELDS = frozenset(field.name for field in fields(InvestmentProfile))
+
 class InvestmentProfileManager:
-    """투자 성향 프로필 관리자"""
+    """투자 성향 프로필 관리자
+
+    프로필은 storage_path 디렉터리 아래에 사용자당 하나의 JSON 파일로 저장한다.
+    변경된 사용자만 dirty로 표시해 해당 파일만 다시 쓰므로 갱신 비용이 전체 사용자 수와 무관하다.
+    시작 시에는 파일 이름 인덱스만 만들고, 프로필은 처음 조회될 때 읽는다.
+    """
     
-    def __init__(self, storage_path: str = "investment_profiles.json"):
+    def __init__(self, storage_path: str = "investment_profiles"):
         self.storage_path = storage_path
         self.profiles: Dict[str, InvestmentProfile] = {}
-        self.load_profiles()
+        self._dirty: Set[str] = set()
+        self._index: Set[str] = set()  # 디스크에 존재하는 프로필 파일 이름
+        # user_id -> (디스크에 기록된 프로필 인스턴스, 그 파일 내용)
+        self._serialized: Dict[str, Tuple[InvestmentProfile, bytes]] = {}
+        if os.path.isdir(self.storage_path):
+            self._scan_index()
+        else:
+            self._migrate_legacy_file()
+    
+    @staticmethod
+    def _file_name(user_id: str) -> str:
+        """사용자 프로필 파일 이름 (user_id는 파일명으로 안전하게 인코딩)"""
+        return f"{quote(user_id, safe='')}.json"
+    
+    def _profile_path(self, user_id: str) -> str:
+        """사용자 프로필 파일 경로"""
+        return os.path.join(self.storage_path, self._file_name(user_id))
+    
+    def _scan_index(self):
+        """프로필 디렉터리의 파일 이름만 인덱싱 (역직렬화 없음)"""
+        with os.scandir(self.storage_path) as entries:
+            self._index = {
+                entry.name for entry in entries
+                if entry.name.endswith('.json') and entry.is_file()
+            }
+    
+    def _load_profile(self, user_id: str) -> Optional[InvestmentProfile]:
+        """단일 사용자 프로필 파일을 읽어 캐시"""
+        try:
+            with open(self._profile_path(user_id), 'rb') as f:
+                raw = f.read()
+            profile = InvestmentProfile.from_dict(orjson.loads(raw))
+        except Exception as e:
+            print(f"프로필 로드 실패 ({user_id}): {e}")
+            self._index.discard(self._file_name(user_id))
+            return None
+        self.profiles[user_id] = profile
+        self._serialized[user_id] = (profile, raw)
+        return profile
     
     def load_profiles(self):
-        """프로필 파일에서 로드"""
-        if os.path.exists(self.storage_path):
+        """인덱싱된 모든 프로필을 즉시 로드"""
+        for name in list(self._index):
             try:
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for user_id, profile_data in data.items():
-                        self.profiles[user_id] = InvestmentProfile.from_dict(profile_data)
+                with open(os.path.join(self.storage_path, name), 'rb') as f:
+                    raw = f.read()
+                profile = InvestmentProfile.from_dict(orjson.loads(raw))
+                if profile.user_id not in self.profiles:
+                    self.profiles[profile.user_id] = profile
+                    self._serialized[profile.user_id] = (profile, raw)
             except Exception as e:
-                print(f"프로필 로드 실패: {e}")
+                print(f"프로필 로드 실패 ({name}): {e}")
     
-    def save_profiles(self):
-        """프로필을 파일에 저장"""
+    def _migrate_legacy_file(self):
+        """단일 파일(<storage_path>.json) 형식의 기존 프로필을 사용자별 파일로 옮긴다"""
+        legacy_path = f"{self.storage_path}.json"
+        if not os.path.isfile(legacy_path):
+            return
         try:
-            data = {user_id: profile.to_dict() for user_id, profile in self.profiles.items()}
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(legacy_path, 'rb') as f:
+                data = orjson.loads(f.read())
+            for user_id, profile_data in data.items():
+                self.profiles[user_id] = InvestmentProfile.from_dict(profile_data)
         except Exception as e:
-            print(f"프로필 저장 실패: {e}")
+            print(f"프로필 로드 실패: {e}")
+            return
+        self.save_profiles()
+    
+    def _write_profile(self, profile: InvestmentProfile):
+        """단일 프로필을 임시 파일에 쓴 뒤 원자적으로 교체"""
+        os.makedirs(self.storage_path, exist_ok=True)
+        path = self._profile_path(profile.user_id)
+        tmp_path = f"{path}.tmp"
+        cached = self._serialized.get(profile.user_id)
+        if cached is not None and cached[0] is profile:
+            data = cached[1]
+        else:
+            data = orjson.dumps(profile.to_dict(), option=orjson.OPT_INDENT_2)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._index.add(self._file_name(profile.user_id))
+        self._serialized[profile.user_id] = (profile, data)
+    
+    def flush(self):
+        """dirty로 표시된 사용자의 프로필 파일만 기록 (삭제된 사용자는 파일 제거)"""
+        for user_id in list(self._dirty):
+            try:
+                profile = self.profiles.get(user_id)
+                if profile is None:
+                    path = self._profile_path(user_id)
+                    if os.path.exists(path):
+                        os.remove(path)
+                    self._index.discard(self._file_name(user_id))
+                    self._serialized.pop(user_id, None)
+                else:
+                    self._write_profile(profile)
+                self._dirty.discard(user_id)
+            except Exception as e:
+                print(f"프로필 저장 실패 ({user_id}): {e}")
+    
+    def save_profiles(self):
+        """모든 프로필을 파일에 저장 (디스크 내용과 같은 프로필은 건너뜀)"""
+        # 프로필은 불변이므로 캐시된 인스턴스와 동일하면 이미 기록된 상태
+        self._dirty.update(
+            user_id for user_id, profile in self.profiles.items()
+            if self._serialized.get(user_id, (None,))[0] is not profile
+        )
+        self.flush()
     
     def get_profile(self, user_id: str) -> Optional[InvestmentProfile]:
-        """사용자 프로필 조회"""
-        return self.profiles.get(user_id)
+        """사용자 프로필 조회 (최초 조회 시 파일에서 로드)"""
+        profile = self.profiles.get(user_id)
+        if profile is None and self._file_name(user_id) in self._index:
+            profile = self._load_profile(user_id)
+        return profile
     
     def save_profile(self, profile: InvestmentProfile):
         """프로필 저장"""
         self.profiles[profile.user_id] = profile
-        self.save_profiles()
+        self._dirty.add(profile.user_id)
+        self.flush()
     
     def update_profile(self, user_id: str, **kwargs):
         """프로필 업데이트"""
-        if user_id in self.profiles:
-            profile = self.profiles[user_id]
-            for key, value in kwargs.items():
-                if hasattr(profile, key):
-                    setattr(profile, key, value)
-            profile.updated_at = datetime.now()
-            self.save_profiles()
+        profile = self.get_profile(user_id)
+        if profile is not None:
+            # 프로필은 불변이므로 변경 필드를 반영한 새 인스턴스로 교체
+            changes = {key: value for key, value in kwargs.items() if key in _PROFILE_FIELDS}
+            if 'preferred_sectors' in changes:
+                changes['preferred_sectors'] = tuple(changes['preferred_sectors'])
+            changes['updated_ts'] = time.time()
+            self.profiles[user_id] = replace(profile, **changes)
+            self._dirty.add(user_id)
+            self.flush()
     
     def delete_profile(self, user_id: str):
         """프로필 삭제"""
-        if user_id in self.profiles:
-            del self.profiles[user_id]
-            self.save_profiles()
+        if user_id in self.profiles or self._file_name(user_id) in self._index:
+            self.profiles.pop(user_id, None)
+            self._dirty.add(user_id)
+            self.flush()
 
 class InvestmentProfileBuilder:
     """투자 성향 프로필 빌더"""
@@ -116,7 +264,7 @@ class InvestmentProfileBuilder:
         self.risk_tolerance: Optional[RiskTolerance] = None
         self.investment_horizon: Optional[InvestmentHorizon] = None
         self.trading_style: Optional[TradingStyle] = None
-        self.preferred_sectors: List[str] = []
+        self._preferred_sectors: Dict[str, None] = {}  # 순서를 유지하는 중복 제거 (dict.fromkeys)
         self.max_position_size: Optional[float] = None
         self.stop_loss_tolerance: Optional[float] = None
         self.take_profit_target: Optional[float] = None
@@ -134,8 +282,11 @@ class InvestmentProfileBuilder:
         return self
     
     def add_preferred_sector(self, sector: str):
-        if sector not in self.preferred_sectors:
-            self.preferred_sectors.append(sector)
+        self._preferred_sectors[sector] = None
+        return self
+    
+    def add_preferred_sectors(self, sectors: Iterable[str]):
+        self._preferred_sectors.update(dict.fromkeys(sectors))
         return self
     
     def set_position_limits(self, max_position: float, stop_loss: float, take_profit: float):
@@ -150,53 +301,24 @@ class InvestmentProfileBuilder:
             raise ValueError("필수 투자 성향 정보가 누락되었습니다.")
         
         # 기본값 설정
-        if not self.max_position_size:
-            self.max_position_size = self._get_default_position_size()
-        if not self.stop_loss_tolerance:
-            self.stop_loss_tolerance = self._get_default_stop_loss()
-        if not self.take_profit_target:
-            self.take_profit_target = self._get_default_take_profit()
+        position_size, stop_loss, take_profit = _RISK_DEFAULTS[self.risk_tolerance]
+        self.max_position_size = self.max_position_size or position_size
+        self.stop_loss_tolerance = self.stop_loss_tolerance or stop_loss
+        self.take_profit_target = self.take_profit_target or take_profit
         
-        now = datetime.now()
+        now = time.time()
         return InvestmentProfile(
             user_id=self.user_id,
             risk_tolerance=self.risk_tolerance,
             investment_horizon=self.investment_horizon,
             trading_style=self.trading_style,
-            preferred_sectors=self.preferred_sectors,
+            preferred_sectors=tuple(self._preferred_sectors),
             max_position_size=self.max_position_size,
             stop_loss_tolerance=self.stop_loss_tolerance,
             take_profit_target=self.take_profit_target,
-            created_at=now,
-            updated_at=now
+            created_ts=now,
+            updated_ts=now
         )
-    
-    def _get_default_position_size(self) -> float:
-        """리스크 성향에 따른 기본 포지션 크기"""
-        if self.risk_tolerance == RiskTolerance.CONSERVATIVE:
-            return 5.0
-        elif self.risk_tolerance == RiskTolerance.MODERATE:
-            return 10.0
-        else:  # AGGRESSIVE
-            return 20.0
-    
-    def _get_default_stop_loss(self) -> float:
-        """리스크 성향에 따른 기본 손절매 범위"""
-        if self.risk_tolerance == RiskTolerance.CONSERVATIVE:
-            return 3.0
-        elif self.risk_tolerance == RiskTolerance.MODERATE:
-            return 5.0
-        else:  # AGGRESSIVE
-            return 8.0
-    
-    def _get_default_take_profit(self) -> float:
-        """리스크 성향에 따른 기본 익절 목표"""
-        if self.risk_tolerance == RiskTolerance.CONSERVATIVE:
-            return 6.0
-        elif self.risk_tolerance == RiskTolerance.MODERATE:
-            return 10.0
-        else:  # AGGRESSIVE
-            return 15.0
 
 # 투자 성향 설문 질문들
 INVESTMENT_QUESTIONNAIRE = {
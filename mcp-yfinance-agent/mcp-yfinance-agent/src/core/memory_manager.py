@@ -1,31 +1,69 @@
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
-import json
+from typing import Dict, List, Optional, Any, Tuple
+from collections import deque
+from itertools import islice
 import os
-from investment_profile import InvestmentProfile, InvestmentProfileManager, InvestmentProfileBuilder, RiskTolerance, InvestmentHorizon, TradingStyle, INVESTMENT_QUESTIONNAIRE
+import time
+import orjson
+from urllib.parse import quote
+from investment_profile import InvestmentProfile, InvestmentProfileManager, InvestmentProfileBuilder, INVESTMENT_QUESTIONNAIRE, RISK_TOLERANCE_BY_VALUE, INVESTMENT_HORIZON_BY_VALUE, TRADING_STYLE_BY_VALUE
+
+# (role, content, timestamp_ns, metadata)
+Message = Tuple[str, str, int, Dict[str, Any]]
+
+# 설문 단계별 질문 템플릿과 다음 단계 (설문은 고정이므로 모듈 로드 시 한 번만 생성)
+_STEP_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    step: {"step": step, "question": data["question"], "options": data["options"]}
+    for step, data in INVESTMENT_QUESTIONNAIRE.items()
+}
+_STEPS = list(INVESTMENT_QUESTIONNAIRE)
+_NEXT_STEP: Dict[str, Optional[str]] = dict(zip(_STEPS, _STEPS[1:] + [None]))
 
 class ConversationMemory:
-    """대화 메모리 관리"""
+    """대화 메모리 관리
+
+    최근 RECENT_MAXLEN개 메시지만 메모리(ring buffer)에 두고,
+    밀려난 메시지는 archive_dir 아래 사용자별 JSONL 파일에 덧붙인다.
+    """
+    
+    RECENT_MAXLEN = 256
     
-    def __init__(self, user_id: str):
+    def __init__(self, user_id: str, profile_manager: Optional[InvestmentProfileManager] = None,
+                 archive_dir: Optional[str] = "conversation_logs"):
         self.user_id = user_id
-        self.conversation_history: List[Dict[str, Any]] = []
+        self._recent: deque[Message] = deque(maxlen=self.RECENT_MAXLEN)
+        self.archive_dir = archive_dir
         self.current_context: Dict[str, Any] = {}
-        self.profile_manager = InvestmentProfileManager()
+        self.profile_manager = profile_manager if profile_manager is not None else InvestmentProfileManager()
     
     def add_message(self, role: str, content: str, metadata: Optional[Dict] = None):
-        """대화 메시지 추가"""
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            "metadata": metadata or {}
-        }
-        self.conversation_history.append(message)
+        """대화 메시지 추가 (timestamp는 UNIX epoch 나노초)"""
+        if len(self._recent) == self._recent.maxlen:
+            self._archive(self._recent[0])
+        self._recent.append((role, content, time.time_ns(), metadata or {}))
+    
+    def _archive(self, message: Message):
+        """ring buffer에서 밀려나는 메시지를 JSONL 파일에 덧붙임"""
+        if not self.archive_dir:
+            return
+        role, content, timestamp, metadata = message
+        try:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            path = os.path.join(self.archive_dir, f"{quote(self.user_id, safe='')}.jsonl")
+            with open(path, 'ab') as f:
+                f.write(orjson.dumps(
+                    {"role": role, "content": content, "timestamp": timestamp, "metadata": metadata},
+                    default=str
+                ) + b"\n")
+        except Exception as e:
+            print(f"대화 기록 보관 실패: {e}")
     
     def get_recent_context(self, limit: int = 10) -> List[Dict[str, Any]]:
         """최근 대화 컨텍스트 반환"""
-        return self.conversation_history[-limit:]
+        start = max(len(self._recent) - limit, 0)
+        return [
+            {"role": role, "content": content, "timestamp": timestamp, "metadata": metadata}
+            for role, content, timestamp, metadata in islice(self._recent, start, None)
+        ]
     
     def get_user_profile(self) -> Optional[InvestmentProfile]:
         """사용자 투자 성향 프로필 조회"""
@@ -58,16 +96,10 @@ class InvestmentProfileCollector:
     
     def get_next_question(self) -> Optional[Dict[str, Any]]:
         """다음 질문 반환"""
-        if self.current_step not in self.questionnaire:
+        template = _STEP_TEMPLATES.get(self.current_step)
+        if template is None:
             return None
-        
-        question_data = self.questionnaire[self.current_step]
-        return {
-            "step": self.current_step,
-            "question": question_data["question"],
-            "options": question_data["options"],
-            "progress": self._get_progress()
-        }
+        return {**template, "progress": self._get_progress()}
     
     def process_answer(self, step: str, answer: str) -> Dict[str, Any]:
         """답변 처리"""
@@ -78,11 +110,10 @@ class InvestmentProfileCollector:
         self.collected_data[step] = answer
         
         # 다음 단계로 이동
-        steps = list(self.questionnaire.keys())
-        current_index = steps.index(step)
+        next_step = _NEXT_STEP[step]
         
-        if current_index < len(steps) - 1:
-            self.current_step = steps[current_index + 1]
+        if next_step is not None:
+            self.current_step = next_step
             return {
                 "success": True,
                 "next_question": self.get_next_question(),
@@ -109,22 +140,22 @@ class InvestmentProfileCollector:
             builder = InvestmentProfileBuilder(self.memory.user_id)
             
             # 리스크 성향 설정
-            risk_tolerance = RiskTolerance(self.collected_data["risk_tolerance"])
+            risk_tolerance = RISK_TOLERANCE_BY_VALUE[self.collected_data["risk_tolerance"]]
             builder.set_risk_tolerance(risk_tolerance)
             
             # 투자 기간 설정
-            investment_horizon = InvestmentHorizon(self.collected_data["investment_horizon"])
+            investment_horizon = INVESTMENT_HORIZON_BY_VALUE[self.collected_data["investment_horizon"]]
             builder.set_investment_horizon(investment_horizon)
             
             # 거래 스타일 설정
-            trading_style = TradingStyle(self.collected_data["trading_style"])
+            trading_style = TRADING_STYLE_BY_VALUE[self.collected_data["trading_style"]]
             builder.set_trading_style(trading_style)
             
             # 선호 섹터 설정
             if "sectors" in self.collected_data:
-                sectors = self.collected_data["sectors"].split(",")
-                for sector in sectors:
-                    builder.add_preferred_sector(sector.strip())
+                builder.add_preferred_sectors(
+                    sector.strip() for sector in self.collected_data["sectors"].split(",")
+                )
             
             # 프로필 생성 및 저장
             profile = builder.build()
@@ -149,7 +180,7 @@ class InvestmentProfileCollector:
             "risk_tolerance": profile.risk_tolerance.value,
             "investment_horizon": profile.investment_horizon.value,
             "trading_style": profile.trading_style.value,
-            "preferred_sectors": profile.preferred_sectors,
+            "preferred_sectors": list(profile.preferred_sectors),
             "max_position_size": f"{profile.max_position_size}%",
             "stop_loss_tolerance": f"{profile.stop_loss_tolerance}%",
             "take_profit_target": f"{profile.take_profit_target}%"
@@ -166,27 +197,30 @@ class MemoryManager:
     def __init__(self):
         self.user_memories: Dict[str, ConversationMemory] = {}
         self.profile_collectors: Dict[str, InvestmentProfileCollector] = {}
+        # 모든 사용자 메모리가 공유하는 프로필 관리자 (프로필 디렉터리 인덱싱은 한 번만)
+        self.profile_manager = InvestmentProfileManager()
     
     def get_memory(self, user_id: str) -> ConversationMemory:
         """사용자 메모리 조회 또는 생성"""
         if user_id not in self.user_memories:
-            self.user_memories[user_id] = ConversationMemory(user_id)
+            self.user_memories[user_id] = ConversationMemory(user_id, self.profile_manager)
         return self.user_memories[user_id]
     
     def get_profile_collector(self, user_id: str) -> InvestmentProfileCollector:
         """투자 성향 수집기 조회 또는 생성"""
-        if user_id not in self.profile_collectors:
-            memory = self.get_memory(user_id)
-            self.profile_collectors[user_id] = InvestmentProfileCollector(memory)
-        return self.profile_collectors[user_id]
+        try:
+            return self.profile_collectors[user_id]
+        except KeyError:
+            collector = self.profile_collectors[user_id] = InvestmentProfileCollector(self.get_memory(user_id))
+            return collector
     
     def start_profile_collection(self, user_id: str) -> Dict[str, Any]:
         """투자 성향 수집 시작"""
-        collector = self.get_profile_collectors(user_id)
-        collector.reset()
+        # 이전 수집 상태를 버리고 새 수집기로 교체
+        memory = self.get_memory(user_id)
+        collector = self.profile_collectors[user_id] = InvestmentProfileCollector(memory)
         
         # 사용자에게 투자 성향 수집 시작 알림
-        memory = self.get_memory(user_id)
         memory.add_message("system", "투자 성향을 파악하기 위해 몇 가지 질문을 드리겠습니다.")
         
         return {
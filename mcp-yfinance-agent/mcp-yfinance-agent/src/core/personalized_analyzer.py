@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, TypedDict, Union
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import yfinance as yf
@@ -7,7 +7,7 @@ import numpy as np
 from investment_profile import InvestmentProfile, RiskTolerance, InvestmentHorizon, TradingStyle
 from memory_manager import memory_manager
 
-@dataclass
+@dataclass(slots=True)
 class TechnicalIndicators:
     """기술적 지표"""
     sma_20: float
@@ -22,7 +22,7 @@ class TechnicalIndicators:
     price_change_5d: float
     price_change_1m: float
 
-@dataclass
+@dataclass(slots=True)
 class RiskEventAnalysis:
     """리스크 이벤트 분석 결과"""
     risk_score: int  # 0-100
@@ -32,7 +32,7 @@ class RiskEventAnalysis:
     high_risk_events_count: int
     recommendation: str
 
-@dataclass
+@dataclass(slots=True)
 class StockAnalysis:
     """종목 분석 결과"""
     ticker: str
@@ -50,6 +50,22 @@ class StockAnalysis:
     analysis_summary: str
     personalized_recommendation: str
 
+class StockRecommendation(TypedDict):
+    """매수/매도 추천 결과"""
+    ticker: str
+    current_price: float
+    currency: str
+    recommendation: str
+    confidence: float
+    reasoning: str
+    buy_price_range: Dict[str, float]
+    sell_price_range: Dict[str, float]
+    stop_loss: float
+    take_profit: float
+    time_horizon: str
+    risk_level: str
+    risk_event_analysis: Optional[RiskEventAnalysis]
+
 class PersonalizedStockAnalyzer:
     """투자 성향 기반 맞춤형 종목 분석기"""
     
@@ -376,9 +392,11 @@ class BuySellRecommendationEngine:
     def __init__(self):
         self.analyzer = PersonalizedStockAnalyzer()
     
-    def get_recommendation(self, ticker: str, user_id: str) -> Dict[str, Any]:
-        """매수/매도 추천"""
-        analysis = self.analyzer.analyze_stock(ticker, user_id)
+    def get_recommendation(self, ticker: str, user_id: str,
+                           analysis: Optional[StockAnalysis] = None) -> Union[StockRecommendation, Dict[str, str]]:
+        """매수/매도 추천 (이미 분석한 결과가 있으면 재사용하여 중복 시세 조회 방지)"""
+        if analysis is None:
+            analysis = self.analyzer.analyze_stock(ticker, user_id)
         if not analysis:
             return {"error": "종목 분석에 실패했습니다."}
         
@@ -389,21 +407,21 @@ class BuySellRecommendationEngine:
         # 추천 로직
         recommendation = self._calculate_recommendation(analysis, profile)
         
-        return {
-            "ticker": ticker,
-            "current_price": analysis.current_price,
-            "currency": analysis.currency,
-            "recommendation": recommendation["action"],
-            "confidence": recommendation["confidence"],
-            "reasoning": recommendation["reasoning"],
-            "buy_price_range": recommendation["buy_price_range"],
-            "sell_price_range": recommendation["sell_price_range"],
-            "stop_loss": recommendation["stop_loss"],
-            "take_profit": recommendation["take_profit"],
-            "time_horizon": recommendation["time_horizon"],
-            "risk_level": recommendation["risk_level"],
-            "risk_event_analysis": analysis.risk_event_analysis
-        }
+        return StockRecommendation(
+            ticker=ticker,
+            current_price=analysis.current_price,
+            currency=analysis.currency,
+            recommendation=recommendation["action"],
+            confidence=recommendation["confidence"],
+            reasoning=recommendation["reasoning"],
+            buy_price_range=recommendation["buy_price_range"],
+            sell_price_range=recommendation["sell_price_range"],
+            stop_loss=recommendation["stop_loss"],
+            take_profit=recommendation["take_profit"],
+            time_horizon=recommendation["time_horizon"],
+            risk_level=recommendation["risk_level"],
+            risk_event_analysis=analysis.risk_event_analysis
+        )
     
     def _calculate_recommendation(self, analysis: StockAnalysis, 
                                 profile: InvestmentProfile) -> Dict[str, Any]:
@@ -125,18 +125,24 @@ class PortfolioAnalyzer:
         # 전체 수익률
         total_return = portfolio.total_unrealized_pnl_percent
         
-        # 승률 (수익 포지션 비율)
-        profitable_positions = [pos for pos in portfolio.positions.values() if pos.unrealized_pnl > 0]
-        win_rate = len(profitable_positions) / len(portfolio.positions) * 100 if portfolio.positions else 0
-        
-        # 평균 수익률
-        avg_return = sum(pos.unrealized_pnl_percent for pos in portfolio.positions.values()) / len(portfolio.positions) if portfolio.positions else 0
-        
-        # 최고 수익률
-        max_gain = max(pos.unrealized_pnl_percent for pos in portfolio.positions.values()) if portfolio.positions else 0
-        
-        # 최대 손실률
-        max_loss = min(pos.unrealized_pnl_percent for pos in portfolio.positions.values()) if portfolio.positions else 0
+        # 승률 / 평균 / 최고 / 최저 수익률을 포지션 한 번 순회로 계산
+        profitable_count = 0
+        return_sum = 0.0
+        max_gain = float("-inf")
+        max_loss = float("inf")
+        for pos in portfolio.positions.values():
+            pnl_percent = pos.unrealized_pnl_percent
+            if pos.unrealized_pnl > 0:
+                profitable_count += 1
+            return_sum += pnl_percent
+            if pnl_percent > max_gain:
+                max_gain = pnl_percent
+            if pnl_percent < max_loss:
+                max_loss = pnl_percent
+        
+        position_count = len(portfolio.positions)
+        win_rate = profitable_count / position_count * 100
+        avg_return = return_sum / position_count
         
         return {
             "total_return_percent": total_return,
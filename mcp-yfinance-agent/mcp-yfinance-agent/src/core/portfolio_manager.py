@@ -1,5 +1,5 @@
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable
 from datetime import datetime
 import json
 import os
@@ -180,8 +180,18 @@ class PortfolioManager:
     def __init__(self, storage_path: str = "portfolios.json"):
         self.storage_path = storage_path
         self.portfolios: Dict[str, Portfolio] = {}
+        self._change_listeners: List[Callable[[str], None]] = []
         self.load_portfolios()
     
+    def add_change_listener(self, listener: Callable[[str], None]):
+        """포트폴리오 변경 시 user_id로 호출될 리스너 등록 (캐시 무효화용)"""
+        self._change_listeners.append(listener)
+    
+    def _notify_change(self, user_id: str):
+        """변경 리스너 호출"""
+        for listener in self._change_listeners:
+            listener(user_id)
+    
     def load_portfolios(self):
         """포트폴리오 파일에서 로드"""
         if os.path.exists(self.storage_path):
@@ -214,6 +224,7 @@ class PortfolioManager:
         portfolio = self.get_portfolio(user_id)
         position = portfolio.add_position(ticker, quantity, average_price, currency, sector)
         self.save_portfolios()
+        self._notify_change(user_id)
         return position
     
     def update_position_price(self, user_id: str, ticker: str, current_price: float) -> Optional[Position]:
@@ -222,6 +233,7 @@ class PortfolioManager:
         position = portfolio.update_position(ticker, current_price)
         if position:
             self.save_portfolios()
+            self._notify_change(user_id)
         return position
     
     def remove_position(self, user_id: str, ticker: str) -> Optional[Position]:
@@ -230,6 +242,7 @@ class PortfolioManager:
         position = portfolio.remove_position(ticker)
         if position:
             self.save_portfolios()
+            self._notify_change(user_id)
         return position
     
     def get_position(self, user_id: str, ticker: str) -> Optional[Position]:
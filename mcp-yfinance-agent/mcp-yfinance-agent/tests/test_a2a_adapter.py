@@ -0,0 +1,62 @@
+"""
+WebSocketTransport msgpack 수신 동작 테스트
+
+실행: python -m unittest discover -s tests
+(Dockerfile과 같은 PYTHONPATH를 아래에서 구성하며, requirements.txt 의존성이 설치되어 있어야 함)
+"""
+
+import os
+import sys
+import unittest
+
+_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+for _path in ("", "agents", "core", "a2a"):
+    _full = os.path.join(_SRC, _path)
+    if _full not in sys.path:
+        sys.path.insert(0, _full)
+
+import msgpack
+
+from a2a_adapter import WebSocketTransport
+from a2a_protocol import A2AProtocol, AgentRole
+
+class _FakeWebSocket:
+    """미리 정한 프레임을 차례로 돌려주는 웹소켓"""
+
+    closed = False
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    async def recv(self):
+        return self.frames.pop(0)
+
+class MsgpackReceiveTest(unittest.IsolatedAsyncioTestCase):
+    """잘린 프레임 이후에도 다음 프레임이 정상 디코딩되는지 확인"""
+
+    def setUp(self):
+        self.transport = WebSocketTransport("receiver", wire_format="msgpack")
+        protocol = A2AProtocol("sender", AgentRole.INVESTMENT_ANALYST)
+        self.message = protocol.create_stock_analysis_request("receiver", "AAPL", "technical")
+        self.frame = self.transport._compress_frame(
+            msgpack.packb([self.message.to_dict()], use_bin_type=True)
+        )
+
+    def test_decode_rejects_truncated_frame(self):
+        unpacker = self.transport._new_unpacker()
+        with self.assertRaises(ValueError):
+            self.transport._decode(self.frame[:-1], unpacker)
+
+    async def test_receive_recovers_after_truncated_frame(self):
+        self.transport.websocket = _FakeWebSocket([self.frame[:-1], self.frame])
+        self.transport._unpacker = self.transport._new_unpacker()
+
+        self.assertIsNone(await self.transport.receive_message())
+        received = await self.transport.receive_message()
+
+        self.assertIsNotNone(received)
+        self.assertEqual(received.message_id, self.message.message_id)
+        self.assertEqual(received.payload, self.message.payload)
+
+if __name__ == "__main__":
+    unittest.main()
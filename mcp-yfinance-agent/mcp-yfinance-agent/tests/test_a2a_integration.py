@@ -0,0 +1,91 @@
+"""
+A2AIntegrationManager.reset() 동작 테스트
+
+실행: python -m unittest discover -s tests
+(Dockerfile과 같은 PYTHONPATH를 아래에서 구성하며, requirements.txt 의존성이 설치되어 있어야 함)
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+for _path in ("", "agents", "core", "a2a"):
+    _full = os.path.join(_SRC, _path)
+    if _full not in sys.path:
+        sys.path.insert(0, _full)
+
+# agent_graph import 시 Config.validate()가 실행되므로 테스트용 키 설정
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from a2a_adapter import InvestmentA2AAdapter, RiskA2AAdapter
+from a2a_integration import A2AIntegrationManager
+from a2a_protocol import A2AProtocol, AgentRole
+
+class ResetTest(unittest.IsolatedAsyncioTestCase):
+    """reset() 중 진행 중인 공유 분석과 일반 대기 요청 처리"""
+
+    async def asyncSetUp(self):
+        self.manager = A2AIntegrationManager()
+        # 서버 기동 없이 어댑터만 구성하고, 전송은 가로채서 기록
+        self.manager.adapters = {
+            "investment": InvestmentA2AAdapter(),
+            "risk": RiskA2AAdapter(),
+        }
+        self.sent = []
+
+        async def capture(message, direct=True):
+            self.sent.append(message)
+            return True
+
+        for adapter in self.manager.adapters.values():
+            adapter.send_message = capture
+        self.remote = A2AProtocol("remote_agent", AgentRole.INVESTMENT_ANALYST)
+
+    async def _wait_for_sent(self, count: int):
+        """요청이 count개 전송될 때까지 이벤트 루프 양보"""
+        for _ in range(100):
+            if len(self.sent) >= count:
+                return
+            await asyncio.sleep(0)
+        self.fail(f"expected {count} requests, got {len(self.sent)}")
+
+    async def _respond(self, message, payload):
+        """요청을 보낸 어댑터에 응답 전달"""
+        adapter = next(a for a in self.manager.adapters.values() if a.agent_id == message.sender_id)
+        await adapter._handle_response(self.remote.create_response(message, payload))
+
+    async def test_reset_keeps_inflight_shared_analysis_requests(self):
+        shared = self.manager._get_shared_analysis("AAPL", "comprehensive")
+        await self._wait_for_sent(2)
+
+        self.manager.reset()
+
+        self.assertEqual(self.manager._inflight, {})
+        for message in self.sent:
+            await self._respond(message, {"from": message.sender_id})
+
+        result = await asyncio.wait_for(shared, 1)
+        self.assertEqual(result, {
+            "investment": {"from": "investment_agent_001"},
+            "risk": {"from": "risk_agent_001"},
+        })
+        for adapter in self.manager.adapters.values():
+            self.assertEqual(adapter.pending_requests, {})
+
+    async def test_reset_fails_other_pending_requests(self):
+        adapter = self.manager.adapters["investment"]
+        waiter = asyncio.ensure_future(
+            adapter.request_stock_analysis("investment_agent_001", "MSFT", "technical")
+        )
+        await self._wait_for_sent(1)
+
+        self.manager.reset()
+
+        self.assertIsNone(await asyncio.wait_for(waiter, 1))
+        self.assertEqual(adapter.pending_requests, {})
+        self.assertEqual(adapter._expiry_heap, [])
+
+if __name__ == "__main__":
+    unittest.main()